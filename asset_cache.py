@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import Dict, Optional
+
+# Bump when rendering code changes in a way that invalidates cached artifacts
+# (2: narration from pluggable TTS backends, clips for the mastered soundtrack)
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "GAN_VIDEO_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "gan_video", "assets"))
+
+
+def asset_key(kind: str, payload: Dict) -> str:
+    """Hash an artifact kind and its inputs into a key"""
+    blob = json.dumps({"version": CACHE_VERSION, "kind": kind, "inputs": payload},
+                      sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class AssetCache:
+    """Content-addressed store for rendered scene artifacts shared across runs and jobs"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = 2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def fetch(self, key: str, suffix: str, dest: str) -> bool:
+        """Copy a cached artifact to dest; returns False on a cache miss"""
+        path = self._path(key, suffix)
+        # Copy under a private name first so an interrupted copy never looks finished
+        tmp_dest = f"{dest}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            shutil.copyfile(path, tmp_dest)
+        except FileNotFoundError:
+            return False
+        os.replace(tmp_dest, dest)
+
+        # Refresh the timestamp so eviction treats this entry as recently used
+        os.utime(path, None)
+        return True
+
+    def store(self, key: str, suffix: str, src: str) -> Optional[str]:
+        """Add a freshly built artifact to the cache"""
+        if not os.path.exists(src) or os.path.getsize(src) > self.max_bytes:
+            return None
+
+        path = self._path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Copy under a private name first so concurrent readers never see a partial file
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, path)
+
+        self.evict()
+        return path
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if ".tmp-" in name:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove every cached artifact"""
+        if os.path.exists(self.cache_dir):
+            shutil.rmtree(self.cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
@@ -0,0 +1,163 @@
+import subprocess
+from typing import List, Optional, Tuple
+import numpy as np
+from ffmpeg_tools import ffmpeg_exe
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+# Loudness is measured over 400 ms blocks, gated like ITU-R BS.1770
+_BLOCK_SECONDS = 0.4
+_ABSOLUTE_GATE = -70.0
+_RELATIVE_GATE = -10.0
+
+# Samples processed at a time when mixing music and streaming to the encoder
+_BLOCK_SAMPLES = 1 << 18
+
+
+def decode_pcm(path: str, sample_rate: int = SAMPLE_RATE, channels: int = CHANNELS) -> np.ndarray:
+    """Decode any audio file to float32 samples of shape (n, channels)"""
+    result = subprocess.run(
+        [ffmpeg_exe(), "-loglevel", "error", "-i", path, "-vn",
+         "-f", "f32le", "-acodec", "pcm_f32le", "-ac", str(channels), "-ar", str(sample_rate), "-"],
+        capture_output=True, check=True)
+    return np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, channels)
+
+
+def loudness(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> float:
+    """Gated loudness in LUFS-like dB (BS.1770 block gating, without K-weighting)"""
+    block = int(_BLOCK_SECONDS * sample_rate)
+    if len(audio) < block:
+        block = max(1, len(audio))
+    blocks = len(audio) // block
+    if blocks == 0:
+        return float("-inf")
+
+    # Mean square per block, summed over channels as BS.1770 does
+    power = (audio[:blocks * block].reshape(blocks, block, -1) ** 2).mean(axis=1).sum(axis=1)
+    with np.errstate(divide="ignore"):
+        block_db = -0.691 + 10 * np.log10(power)
+
+    gated = power[block_db > _ABSOLUTE_GATE]
+    if len(gated) == 0:
+        return float("-inf")
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) + _RELATIVE_GATE
+    gated = power[block_db > max(_ABSOLUTE_GATE, relative_gate)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def normalization_gain(audio: np.ndarray, target_lufs: float, peak_ceiling_db: float = -1.0,
+                       sample_rate: int = SAMPLE_RATE) -> np.float32:
+    """Linear gain reaching the target loudness without pushing peaks above the ceiling"""
+    level = loudness(audio, sample_rate)
+    peak = float(np.abs(audio).max()) if len(audio) else 0.0
+    if level == float("-inf") or peak == 0.0:
+        # Silence stays silence
+        return np.float32(1.0)
+    gain_db = min(target_lufs - level, peak_ceiling_db - 20 * np.log10(peak))
+    return np.float32(10 ** (gain_db / 20))
+
+
+def voice_envelope(voice: np.ndarray, sample_rate: int = SAMPLE_RATE, threshold_db: float = -45.0,
+                   attack: float = 0.05, release: float = 0.4) -> np.ndarray:
+    """Per-sample 0..1 curve that is 1 while narration is speaking, with smooth edges"""
+    window = max(1, int(0.02 * sample_rate))
+    frames = len(voice) // window + 1
+    # Window RMS a block at a time; the last window is zero-padded
+    rms = np.zeros(frames, dtype=np.float32)
+    block = max(1, _BLOCK_SAMPLES // window) * window
+    for start in range(0, len(voice), block):
+        chunk = voice[start:start + block]
+        first = start // window
+        whole = len(chunk) // window
+        squares = (chunk[:whole * window].reshape(whole, window, -1) ** 2).mean(axis=(1, 2))
+        rms[first:first + whole] = squares
+        if len(chunk) % window:
+            rms[first + whole] = (chunk[whole * window:] ** 2).sum() / (window * voice.shape[1])
+    rms = np.sqrt(rms)
+    with np.errstate(divide="ignore"):
+        active = (20 * np.log10(rms) > threshold_db).astype(np.float32)
+
+    # Hold the duck through short pauses, then smooth the edges
+    hold = max(1, int(release * sample_rate / window))
+    active = np.convolve(active, np.ones(hold), mode="full")[:frames] > 0
+    smooth = max(1, int(attack * sample_rate / window))
+    envelope = np.convolve(active.astype(np.float32), np.ones(smooth) / smooth, mode="same")
+    return np.repeat(envelope, window)[:len(voice)]
+
+
+def mix_music(voice: np.ndarray, music: np.ndarray, music_db: float = -18.0,
+              duck_db: float = -12.0, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Loop music under the narration, lowered further while the narrator speaks.
+
+    Mixes into voice in place, a block at a time, and returns it.
+    """
+    if len(music) == 0:
+        return voice
+    envelope = voice_envelope(voice, sample_rate)
+    for start in range(0, len(voice), _BLOCK_SAMPLES):
+        end = min(start + _BLOCK_SAMPLES, len(voice))
+        # The looped music for [start, end)
+        positions = np.arange(start, end) % len(music)
+        gain = (10 ** ((music_db + duck_db * envelope[start:end]) / 20)).astype(np.float32)
+        voice[start:end] += music[positions] * gain[:, None]
+    return voice
+
+
+def encode_audio(audio: np.ndarray, output_path: str, sample_rate: int = SAMPLE_RATE,
+                 codec: str = "aac", bitrate: str = "192k"):
+    """Encode float32 samples into a single audio file, streamed to ffmpeg in blocks"""
+    cmd = [ffmpeg_exe(), "-y", "-loglevel", "error",
+           "-f", "f32le", "-ar", str(sample_rate), "-ac", str(audio.shape[1]), "-i", "-",
+           "-c:a", codec, "-b:a", bitrate, output_path]
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for start in range(0, len(audio), _BLOCK_SAMPLES):
+            block = np.ascontiguousarray(audio[start:start + _BLOCK_SAMPLES], dtype=np.float32)
+            process.stdin.write(memoryview(block).cast("B"))
+    except BrokenPipeError:
+        # ffmpeg exited early; its exit status and stderr say why
+        pass
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read()
+        returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr.decode(errors="replace"))
+
+
+def master_narration(clips: List[Tuple[str, float]], output_path: str,
+                     target_lufs: float = -16.0, music_path: Optional[str] = None,
+                     music_db: float = -18.0, duck_db: float = -12.0,
+                     codec: str = "aac", sample_rate: int = SAMPLE_RATE) -> str:
+    """Build the whole video's soundtrack from (narration file, scene duration) pairs.
+
+    Each narration is decoded once and normalized to the same loudness, so levels
+    match across scenes; optional background music is ducked under the voice.
+    Only the timeline and one decoded clip are in memory at a time.
+    """
+    lengths = [round(duration * sample_rate) for _, duration in clips]
+    audio = np.zeros((sum(lengths), CHANNELS), dtype=np.float32)
+    start = 0
+    for (path, _), length in zip(clips, lengths):
+        clip = decode_pcm(path, sample_rate)
+        n = min(len(clip), length)
+        # Copied into its slot first, then scaled there, so no normalized copy is made
+        audio[start:start + n] = clip[:n]
+        audio[start:start + n] *= normalization_gain(clip, target_lufs, sample_rate=sample_rate)
+        del clip
+        start += length
+
+    if music_path:
+        mix_music(audio, decode_pcm(music_path, sample_rate), music_db, duck_db, sample_rate)
+        # Keep the mix from clipping after the music is added
+        peak = max((float(np.abs(audio[start:start + _BLOCK_SAMPLES]).max())
+                    for start in range(0, len(audio), _BLOCK_SAMPLES)), default=0.0)
+        if peak > 1.0:
+            audio /= peak
+
+    encode_audio(audio, output_path, sample_rate, codec)
+    return output_path
@@ -0,0 +1,144 @@
+import hashlib
+import struct
+import threading
+from typing import Dict, Optional
+
+from ffmpeg_tools import probe_duration as _probe_duration_ffmpeg
+
+# Bitrates in kbps by (MPEG-1?, layer)[index]; index 0 (free format) and 15 are invalid
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Sample rates by MPEG version bits (0 = 2.5, 2 = 2, 3 = 1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+# Durations by audio content hash, so re-synthesized or copied files are probed once
+_DURATIONS: Dict[str, float] = {}
+_LOCK = threading.Lock()
+
+
+def _mp3_frame(data: bytes, pos: int) -> Optional[tuple]:
+    """Parse the frame header at pos; returns (frame length, samples, sample rate) or None"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 3
+    layer = 4 - ((data[pos + 1] >> 1) & 3)
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 3
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[mpeg1, layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (data[pos + 2] >> 1) & 1
+
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 576 if layer == 3 and not mpeg1 else 1152
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def _is_info_frame(data: bytes, pos: int) -> bool:
+    """Xing/Info/VBRI frames carry encoder metadata, not audio"""
+    mpeg1 = (data[pos + 1] >> 3) & 3 == 3
+    mono = data[pos + 3] >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    tag = data[pos + 4 + side_info:pos + 8 + side_info]
+    return tag in (b"Xing", b"Info") or data[pos + 36:pos + 40] == b"VBRI"
+
+
+def mp3_duration(data: bytes) -> float:
+    """Duration of MP3 data by walking every frame header (exact for CBR, VBR and joined files)"""
+    pos = 0
+    seconds = 0.0
+    frames = 0
+    while pos + 10 <= len(data):
+        if data[pos:pos + 3] == b"ID3":
+            # ID3v2 tag: syncsafe size, plus a 10-byte footer when flagged
+            size = ((data[pos + 6] & 0x7F) << 21 | (data[pos + 7] & 0x7F) << 14
+                    | (data[pos + 8] & 0x7F) << 7 | (data[pos + 9] & 0x7F))
+            pos += 10 + size + (10 if data[pos + 5] & 0x10 else 0)
+            continue
+
+        frame = _mp3_frame(data, pos)
+        if frame is None:
+            # Resynchronize on the next plausible frame header
+            pos = data.find(b"\xff", pos + 1)
+            if pos < 0:
+                break
+            continue
+
+        length, samples, sample_rate = frame
+        # Count a frame only when the next one follows it (or the data ends), to skip false syncs
+        following = pos + length
+        if following < len(data) - 4 and _mp3_frame(data, following) is None \
+                and data[following:following + 3] not in (b"TAG", b"ID3", b"APE"):
+            pos += 1
+            continue
+        if not _is_info_frame(data, pos):
+            seconds += samples / sample_rate
+        frames += 1
+        pos = following
+
+    if frames == 0:
+        raise ValueError("no MPEG audio frames found")
+    return seconds
+
+
+def wav_duration(data: bytes) -> float:
+    """Duration of RIFF/WAVE data from the fmt byte rate and data chunk size"""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+
+    byte_rate = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[pos + 16:pos + 20])[0]
+        elif chunk_id == b"data":
+            if byte_rate is None:
+                break
+            # Streaming writers leave the size unset (0 or 0xFFFFFFFF): use what is there
+            available = len(data) - pos - 8
+            if size == 0 or size > available:
+                size = available
+            return size / byte_rate
+        pos += 8 + size + (size & 1)
+    raise ValueError("WAVE file has no fmt/data chunks")
+
+
+def probe_duration(path: str) -> float:
+    """Duration of an audio file in seconds without decoding it.
+
+    MP3 and WAV are read from their headers; anything else goes to ffprobe (or
+    ffmpeg). Results are cached by content hash.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    key = hashlib.sha256(data).hexdigest()
+
+    with _LOCK:
+        if key in _DURATIONS:
+            return _DURATIONS[key]
+
+    try:
+        if data[:4] == b"RIFF":
+            duration = wav_duration(data)
+        elif data[:3] == b"ID3" or _mp3_frame(data, 0) is not None:
+            duration = mp3_duration(data)
+        else:
+            raise ValueError("unknown audio container")
+    except (ValueError, IndexError, struct.error, ZeroDivisionError):
+        duration = _probe_duration_ffmpeg(path)
+
+    with _LOCK:
+        _DURATIONS[key] = duration
+    return duration
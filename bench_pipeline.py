@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark
+Times every stage on synthetic PDFs and scripts and keeps a JSON history to compare commits
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+DEFAULT_HISTORY = "bench_history.json"
+
+# Titles chosen so synthetic scenes cycle through every diagram type
+SCENE_TITLES = ["Introduction to GaN Technology", "Applications of GaN", "HEMT Device Structure",
+                "Performance Comparison", "Material Properties"]
+SCENE_ACTIONS = ["greeting", "explaining", "explaining", "explaining", "concluding"]
+
+BODY_LINE = "gallium nitride transistors offer a wide bandgap, high breakdown field and high mobility."
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = 40, section_every: int = 3) -> str:
+    """Write a text-only PDF with a numbered section header every few pages"""
+    objects: List[bytes] = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pages_id = 2 + 2 * pages
+    page_ids = []
+    for page in range(pages):
+        lines = []
+        if page % section_every == 0:
+            lines.append(f"{page // section_every + 1}. Section {page // section_every + 1}")
+        lines += [f"Page {page} line {line}: {BODY_LINE}" for line in range(lines_per_page)]
+        stream = ("BT /F1 9 Tf 40 760 Td 11 TL "
+                  + " ".join(f"({_pdf_string(line)}) '" for line in lines) + " ET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 1 0 R >> >> >>" % (pages_id, len(objects)))
+        page_ids.append(len(objects))
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                   % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), pages))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, len(objects), xref)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def make_script(scenes: int, words: int = 40) -> Dict:
+    """A video script with scenes cycling through every diagram type and pose"""
+    narration = " ".join((BODY_LINE.split() * (words // 10 + 1))[:words])
+    return {
+        "title": "Synthetic benchmark script",
+        "scene_count": scenes,
+        "scenes": [{"scene_id": n + 1,
+                    "title": SCENE_TITLES[n % len(SCENE_TITLES)],
+                    "narration": f"Scene {n + 1}. {narration}.",
+                    "duration": 5,
+                    "image_prompt": "",
+                    "character_action": SCENE_ACTIONS[n % len(SCENE_ACTIONS)]}
+                   for n in range(scenes)],
+    }
+
+
+class StageTimer:
+    """Accumulates wall time per named stage"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+
+def bench_pdf(pages: int, workdir: str) -> Dict:
+    """Extraction, section parsing and script generation on a synthetic PDF"""
+    from pdf_extractor import PDFExtractor
+    from script_generator import ScriptGenerator
+
+    pdf_path = make_pdf(os.path.join(workdir, f"synthetic_{pages}.pdf"), pages)
+    timer = StageTimer()
+    extractor = PDFExtractor(pdf_path, cache_dir=None)
+    with timer.stage("extract_text"):
+        extractor.extract_text()
+    with timer.stage("parse_sections"):
+        sections = extractor.parse_sections()
+    with timer.stage("generate_script"):
+        scenes = ScriptGenerator(pdf_path, extractor=extractor).generate_script(
+            max_sections=len(sections))
+
+    total = sum(timer.stages.values())
+    return {"stages": timer.stages, "total": total, "sections": len(sections), "scenes": len(scenes),
+            "throughput": {"pages_per_second": pages / total if total else 0.0}}
+
+
+def bench_video(scenes: int, workdir: str, width: int = 1920, height: int = 1080) -> Dict:
+    """Every render stage on a synthetic script, with silent offline narration"""
+    from video_generator import VideoGenerator
+
+    os.chdir(workdir)
+    generator = VideoGenerator(None, os.path.join(workdir, "bench.mp4"),
+                               script_data=make_script(scenes), cache_dir=None,
+                               tts="silent", subtitles=False)
+    generator.width, generator.height = width, height
+    timer = StageTimer()
+
+    with timer.stage("generate_audio"):
+        audio_paths = [generator.generate_audio(scene) for scene in generator.scenes]
+
+    scene_paths = []
+    for scene, audio_path in zip(generator.scenes, audio_paths):
+        with timer.stage("render_scene_still"):
+            frame = generator.render_scene_still(scene)
+        with timer.stage("encode_scene"):
+            scene_paths.append(generator.encode_scene(scene, frame, audio_path))
+
+    video_path = os.path.join(generator.temp_dir, "video_only.mp4")
+    with timer.stage("concat"):
+        generator._concat(scene_paths, video_path)
+    with timer.stage("master_audio"):
+        generator.master_audio()
+
+    total = sum(timer.stages.values())
+    return {"stages": timer.stages, "total": total, "scenes": scenes,
+            "throughput": {"scenes_per_minute": scenes / total * 60 if total else 0.0}}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB (ffmpeg runs in its own processes)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_case(kind: str, size: int, width: int, height: int) -> Dict:
+    """Run one case in a fresh interpreter, so peak RSS belongs to that case alone"""
+    with tempfile.TemporaryDirectory(prefix="bench_") as workdir:
+        result_path = os.path.join(workdir, "result.json")
+        command = [sys.executable, os.path.abspath(__file__), "--case", kind, str(size),
+                   "--width", str(width), "--height", str(height), "--result", result_path,
+                   "--workdir", workdir]
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise RuntimeError(f"{kind} {size} failed:\n{completed.stderr[-2000:]}")
+        with open(result_path) as f:
+            return json.load(f)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        root = os.path.dirname(os.path.abspath(__file__))
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_run(path: str, run: Dict) -> None:
+    history = load_history(path) + [run]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def print_case(name: str, result: Dict) -> None:
+    throughput = ", ".join(f"{value:.1f} {unit.replace('_', ' ')}"
+                           for unit, value in result["throughput"].items())
+    print(f"{name}: {result['total']:.2f}s total, {throughput}, "
+          f"peak RSS {result['peak_rss_mb'] or 0:.0f} MB")
+    for stage, seconds in result["stages"].items():
+        print(f"  {stage:22}{seconds:10.3f}s")
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[str]:
+    """Print stage-by-stage changes between two runs; returns the regressions"""
+    print(f"Comparing {baseline.get('commit')} ({baseline['date']}) -> "
+          f"{current.get('commit')} ({current['date']})")
+    regressions = []
+    for case, result in current["cases"].items():
+        before = baseline["cases"].get(case)
+        if before is None:
+            continue
+        print(case)
+        rows = list(result["stages"].items()) + [("total", result["total"]),
+                                                 ("peak_rss_mb", result["peak_rss_mb"])]
+        old_rows = dict(before["stages"], total=before["total"],
+                        peak_rss_mb=before["peak_rss_mb"])
+        for stage, value in rows:
+            old = old_rows.get(stage)
+            if not old or value is None:
+                continue
+            change = value / old - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{case} {stage} {change:+.1%}")
+            print(f"  {stage:22}{old:10.3f}{value:10.3f}{change:+9.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic inputs")
+    parser.add_argument("--pages", type=int, nargs="*", default=[10, 100, 1000],
+                        help="Synthetic PDF sizes")
+    parser.add_argument("--scenes", type=int, nargs="*", default=[1, 50, 500],
+                        help="Synthetic script sizes")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON file runs are appended to")
+    parser.add_argument("--no-record", action="store_true", help="Do not append this run to the history")
+    parser.add_argument("--compare", action="store_true",
+                        help="Compare against the previous run (or --baseline) instead of running")
+    parser.add_argument("--baseline", metavar="COMMIT", help="Compare against the latest run of COMMIT")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression")
+    # Internal: run a single case in this process and write its result
+    parser.add_argument("--case", nargs=2, metavar=("KIND", "SIZE"), help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        kind, size = args.case[0], int(args.case[1])
+        if kind == "pdf":
+            result = bench_pdf(size, args.workdir)
+        else:
+            result = bench_video(size, args.workdir, args.width, args.height)
+        result["peak_rss_mb"] = _peak_rss_mb()
+        with open(args.result, "w") as f:
+            json.dump(result, f)
+        return 0
+
+    if args.compare:
+        history = load_history(args.history)
+        if len(history) < 2 and not (args.baseline and history):
+            print(f"Need at least two runs in {args.history} to compare")
+            return 1
+        current = history[-1]
+        baseline = history[-2]
+        if args.baseline:
+            matches = [run for run in history[:-1] if (run.get("commit") or "").startswith(args.baseline)]
+            if not matches:
+                print(f"No run of {args.baseline} in {args.history}")
+                return 1
+            baseline = matches[-1]
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+            return 1
+        return 0
+
+    run = {"commit": _git_revision(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+           "host": platform.node(), "python": platform.python_version(),
+           "cpus": os.cpu_count(), "resolution": [args.width, args.height], "cases": {}}
+    cases = [("pdf", pages) for pages in args.pages] + [("video", scenes) for scenes in args.scenes]
+    for kind, size in cases:
+        name = f"{kind}-{size}"
+        print(f"Running {name}...")
+        run["cases"][name] = run_case(kind, size, args.width, args.height)
+        print_case(name, run["cases"][name])
+
+    if not args.no_record:
+        save_run(args.history, run)
+        print(f"Recorded run {run['commit']} in {args.history}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Renderer benchmark
+Times each slide backend on every diagram type it supports
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+# One representative scene per diagram type
+BENCH_SCENES = {
+    "crystal": {"title": "Introduction to GaN Technology"},
+    "applications": {"title": "Applications of GaN"},
+    "hemt": {"title": "HEMT Device Structure"},
+    "performance": {"title": "Performance Comparison"},
+    "tech": {"title": "Material Properties"},
+}
+
+
+def time_render(renderer, scene: Dict, width: int, height: int, runs: int) -> float:
+    """Median render time in milliseconds, after one warm-up render"""
+    renderer.render(scene, width, height)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        renderer.render(scene, width, height)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def benchmark(backends: List[str], width: int = 1920, height: int = 1080,
+              runs: int = 5) -> Dict[str, Dict[str, float]]:
+    """Return {diagram: {backend: median ms}} and print a comparison table"""
+    from scene_renderers import get_renderer
+
+    results = {}
+    print(f"{'diagram':14}" + "".join(f"{name:>14}" for name in backends) + f"{'speedup':>10}")
+    for diagram, scene in BENCH_SCENES.items():
+        timings = {}
+        for name in backends:
+            renderer = get_renderer(name)
+            if renderer.supports(diagram):
+                timings[name] = time_render(renderer, scene, width, height, runs)
+        results[diagram] = timings
+
+        cells = "".join(f"{timings[name]:11.1f} ms" if name in timings else f"{'-':>14}"
+                        for name in backends)
+        speedup = ""
+        if len(timings) > 1:
+            speedup = f"{max(timings.values()) / min(timings.values()):9.1f}x"
+        print(f"{diagram:14}{cells}{speedup:>10}")
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare slide renderer backends")
+    parser.add_argument("--backends", nargs="+", default=["matplotlib", "pillow"])
+    parser.add_argument("--runs", type=int, default=5, help="Timed renders per diagram")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args(argv)
+
+    benchmark(args.backends, args.width, args.height, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
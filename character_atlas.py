@@ -0,0 +1,136 @@
+from typing import Callable, Dict, Optional
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Poses are drawn on a square canvas of this size, then scaled into the atlas
+CANVAS_SIZE = 400
+
+# Fraction of the canvas size the character occupies on screen
+DEFAULT_SCALE = 0.3
+
+PoseDrawer = Callable[[ImageDraw.ImageDraw], None]
+
+_POSE_DRAWERS: Dict[str, PoseDrawer] = {}
+
+_ATLASES: Dict[float, "CharacterAtlas"] = {}
+
+
+def register_pose(name: str, drawer: Optional[PoseDrawer] = None):
+    """Register a pose drawer; usable directly or as a decorator"""
+    def register(func: PoseDrawer) -> PoseDrawer:
+        _POSE_DRAWERS[name] = func
+        # Drop already rendered sprites so the new drawing is picked up
+        for atlas in _ATLASES.values():
+            atlas.sprites.pop(name, None)
+        return func
+
+    if drawer is not None:
+        return register(drawer)
+    return register
+
+
+def _draw_head(draw: ImageDraw.ImageDraw):
+    # Head
+    draw.ellipse([150, 50, 250, 150], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
+    # Eyes
+    draw.ellipse([170, 80, 190, 100], fill=(255, 255, 255))
+    draw.ellipse([210, 80, 230, 100], fill=(255, 255, 255))
+    draw.ellipse([175, 85, 185, 95], fill=(0, 0, 0))
+    draw.ellipse([215, 85, 225, 95], fill=(0, 0, 0))
+
+
+@register_pose("greeting")
+def _draw_greeting(draw: ImageDraw.ImageDraw):
+    """Waving character"""
+    _draw_head(draw)
+    # Smile
+    draw.arc([170, 100, 230, 130], start=0, end=180, fill=(50, 100, 200), width=3)
+    # Body
+    draw.rectangle([170, 150, 230, 250], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
+    # Waving arm
+    draw.line([230, 170, 280, 140], fill=(100, 150, 255), width=20)
+    draw.ellipse([270, 130, 290, 150], fill=(255, 200, 150))
+    # Other arm
+    draw.line([170, 170, 120, 200], fill=(100, 150, 255), width=20)
+
+
+@register_pose("explaining")
+def _draw_explaining(draw: ImageDraw.ImageDraw):
+    """Presenting character"""
+    _draw_head(draw)
+    # Talking mouth
+    draw.ellipse([180, 110, 220, 125], fill=(50, 100, 200))
+    # Body
+    draw.rectangle([170, 150, 230, 250], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
+    # Pointing arm
+    draw.line([230, 170, 280, 170], fill=(100, 150, 255), width=20)
+    draw.polygon([(280, 160), (300, 170), (280, 180)], fill=(255, 200, 150))
+    # Other arm
+    draw.line([170, 170, 120, 200], fill=(100, 150, 255), width=20)
+
+
+@register_pose("concluding")
+def _draw_concluding(draw: ImageDraw.ImageDraw):
+    """Confident stance"""
+    _draw_head(draw)
+    # Confident smile
+    draw.arc([170, 100, 230, 130], start=0, end=180, fill=(50, 100, 200), width=3)
+    # Body
+    draw.rectangle([170, 150, 230, 250], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
+    # Arms crossed
+    draw.line([170, 170, 230, 200], fill=(100, 150, 255), width=20)
+    draw.line([230, 170, 170, 200], fill=(100, 150, 255), width=20)
+
+
+def draw_pose(action: str) -> Image.Image:
+    """Draw a pose at full canvas size; unknown actions use the concluding pose"""
+    img = Image.new('RGBA', (CANVAS_SIZE, CANVAS_SIZE), (0, 0, 0, 0))
+    drawer = _POSE_DRAWERS.get(action, _POSE_DRAWERS["concluding"])
+    drawer(ImageDraw.Draw(img))
+    return img
+
+
+def composite_sprite(frame: np.ndarray, sprite: np.ndarray, x: int, y: int):
+    """Blend a premultiplied RGBA sprite onto an RGB frame in place at (x, y)"""
+    h, w = sprite.shape[:2]
+    region = frame[y:y + h, x:x + w]
+    inverse_alpha = 255 - sprite[..., 3:4].astype(np.uint16)
+    # Rounded premultiplied sprites can exceed 255 by one step at soft edges; summed
+    # in uint16 and clipped, instead of wrapping to black in the uint8 frame
+    blended = sprite[..., :3].astype(np.uint16) + (region * inverse_alpha + 127) // 255
+    region[...] = np.minimum(blended, 255)
+
+
+class CharacterAtlas:
+    """All registered poses pre-rendered at their on-screen size"""
+
+    def __init__(self, scale: float = DEFAULT_SCALE):
+        self.scale = scale
+        self.size = int(CANVAS_SIZE * scale)
+        self.sprites: Dict[str, np.ndarray] = {}
+
+    def sprite(self, action: str) -> np.ndarray:
+        """Premultiplied RGBA sprite for a pose (read-only, shared by all callers)"""
+        if action not in _POSE_DRAWERS:
+            action = "concluding"
+        if action not in self.sprites:
+            # Resample in premultiplied space ("RGBa") so edges do not pick up dark fringes
+            img = draw_pose(action).convert('RGBa').resize((self.size, self.size),
+                                                          Image.Resampling.LANCZOS)
+            sprite = np.array(img)
+            sprite.flags.writeable = False
+            self.sprites[action] = sprite
+        return self.sprites[action]
+
+    def build(self) -> "CharacterAtlas":
+        """Render every registered pose up front"""
+        for action in _POSE_DRAWERS:
+            self.sprite(action)
+        return self
+
+
+def get_atlas(scale: float = DEFAULT_SCALE) -> CharacterAtlas:
+    """Process-wide atlas for a scale, built on first use"""
+    if scale not in _ATLASES:
+        _ATLASES[scale] = CharacterAtlas(scale)
+    return _ATLASES[scale]
@@ -6,9 +6,7 @@ Creates an AI character video with images explaining the content of the GaN Over
 
 import os
 import sys
-from pdf_extractor import PDFExtractor
-from script_generator import ScriptGenerator
-from video_generator import VideoGenerator
+from pipeline import Pipeline, check_dependencies
 
 def main():
     print("=== GaN Overview Video Creator ===")
@@ -21,33 +19,28 @@ def main():
         print(f"Error: PDF file not found at {pdf_path}")
         sys.exit(1)
     
+    pipeline = Pipeline(pdf_path, script_path="video_script.json")
+    
     print("Step 1: Extracting content from PDF...")
-    extractor = PDFExtractor(pdf_path)
-    text = extractor.extract_text()
-    print(f"✓ Extracted {len(text)} characters from PDF")
+    pipeline.extract()
     
     print("\nStep 2: Generating video script...")
-    script_gen = ScriptGenerator(pdf_path)
-    script = script_gen.generate_script()
-    script_gen.save_script("video_script.json")
-    print(f"✓ Generated script with {len(script)} scenes")
-    
-    print("\nStep 3: Installing required dependencies...")
-    print("Please run: pip3 install --break-system-packages -r requirements.txt")
-    print("Note: Some packages like matplotlib, pillow, and gtts are needed for video generation")
+    pipeline.script()
     
-    # Check if user wants to continue
-    response = input("\nHave you installed the dependencies? (y/n): ")
-    if response.lower() != 'y':
-        print("Please install dependencies and run again.")
+    print("\nStep 3: Checking required dependencies...")
+    missing = check_dependencies(["render", "gtts"])
+    if missing:
+        print(f"Missing: {', '.join(missing)}")
+        print("Please run: pip3 install --break-system-packages -r requirements.txt")
         sys.exit(0)
+    print("✓ All dependencies available")
     
     print("\nStep 4: Generating video...")
     print("This may take several minutes depending on the number of scenes.")
     
     try:
-        video_gen = VideoGenerator("video_script.json")
-        output_path = video_gen.generate_video()
+        output_path = pipeline.render()
+        video_gen = pipeline.video_generator
         
         print(f"\n✓ Video successfully created: {output_path}")
         print(f"Video duration: {video_gen.script_data['total_duration']} seconds")
@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Distributed scene rendering
+A coordinator publishes scene jobs to a work queue, workers on any node claim them
+with leases and upload finished clips to a shared store, and the coordinator
+stitches the clips in scene order.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from job_manifest import atomic_output
+from tracing import span
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: the file queue is only safe for workers in one process
+    fcntl = None
+
+if TYPE_CHECKING:
+    from video_generator import VideoGenerator
+
+# Job records move between these states; "meta" holds the run's spec and the closed flag
+STATES = ("pending", "leased", "done", "failed")
+
+
+class WorkQueue:
+    """Scene jobs shared by one coordinator and any number of workers.
+
+    Subclasses only store records; every state change happens here under the
+    subclass's lock. A claim is a lease that the worker renews while it works.
+    Expired leases (dead or stalled workers) and failed jobs go back to pending
+    until a job has used max_attempts. Lease times come from time.time(), so
+    node clocks should be kept in sync (NTP).
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        self.max_attempts = max_attempts
+
+    # Storage, provided by subclasses
+
+    def _locked(self):
+        raise NotImplementedError
+
+    def _list(self, state: str) -> List[str]:
+        raise NotImplementedError
+
+    def _read(self, state: str, job_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def _write(self, state: str, job_id: str, record: Dict):
+        raise NotImplementedError
+
+    def _delete(self, state: str, job_id: str):
+        raise NotImplementedError
+
+    # Coordinator side
+
+    def open(self, spec: Dict):
+        """Drop jobs of any earlier run and publish the spec workers build their renderer from"""
+        with self._locked():
+            for state in STATES + ("meta",):
+                for job_id in self._list(state):
+                    self._delete(state, job_id)
+            self._write("meta", "spec", spec)
+
+    def put(self, job_id: str, payload: Dict):
+        with self._locked():
+            self._write("pending", job_id, {"payload": payload, "attempts": 0, "lease": None})
+
+    def cancel(self, job_id: str):
+        """Withdraw a job; a worker already rendering it finishes, and its result is ignored"""
+        with self._locked():
+            self._delete("pending", job_id)
+            self._delete("leased", job_id)
+
+    def expire_leases(self) -> List[str]:
+        """Re-dispatch jobs whose worker stopped renewing its lease"""
+        expired = []
+        now = time.time()
+        with self._locked():
+            for job_id in self._list("leased"):
+                record = self._read("leased", job_id)
+                if record is None or record["lease"]["expires"] > now:
+                    continue
+                self._delete("leased", job_id)
+                self._retry(job_id, record, f"lease of {record['lease']['worker']} expired")
+                expired.append(job_id)
+        return expired
+
+    def collect(self) -> Tuple[List[Tuple[str, Dict, Dict]], List[Tuple[str, Dict, str]]]:
+        """Take the results of finished jobs and the jobs that ran out of attempts"""
+        with self._locked():
+            results = []
+            for job_id in self._list("done"):
+                record = self._read("done", job_id)
+                self._delete("done", job_id)
+                if record is not None:
+                    results.append((job_id, record["payload"], record["result"]))
+            failures = []
+            for job_id in self._list("failed"):
+                record = self._read("failed", job_id)
+                self._delete("failed", job_id)
+                if record is not None:
+                    failures.append((job_id, record["payload"], record["error"]))
+        return results, failures
+
+    def running(self) -> Dict[str, Dict]:
+        """Leased jobs: {job_id: record with its payload and lease}"""
+        with self._locked():
+            records = {job_id: self._read("leased", job_id) for job_id in self._list("leased")}
+        return {job_id: record for job_id, record in records.items() if record is not None}
+
+    def pending(self) -> int:
+        with self._locked():
+            return len(self._list("pending"))
+
+    def close(self):
+        """Tell workers that no more jobs are coming"""
+        with self._locked():
+            self._write("meta", "closed", {"closed": time.time()})
+
+    # Worker side
+
+    def spec(self) -> Optional[Dict]:
+        with self._locked():
+            return self._read("meta", "spec")
+
+    def closed(self) -> bool:
+        with self._locked():
+            return self._read("meta", "closed") is not None
+
+    def claim(self, worker: str, lease_seconds: float) -> Optional[Tuple[str, Dict]]:
+        """Lease the next pending job; returns (job_id, payload) or None"""
+        with self._locked():
+            for job_id in sorted(self._list("pending")):
+                record = self._read("pending", job_id)
+                if record is None:
+                    continue
+                now = time.time()
+                record["lease"] = {"worker": worker, "claimed": now, "expires": now + lease_seconds}
+                self._write("leased", job_id, record)
+                self._delete("pending", job_id)
+                return job_id, record["payload"]
+        return None
+
+    def renew(self, job_id: str, worker: str, lease_seconds: float) -> bool:
+        """Extend a lease; False if the job was re-dispatched or cancelled meanwhile"""
+        with self._locked():
+            record = self._read("leased", job_id)
+            if record is None or record["lease"]["worker"] != worker:
+                return False
+            record["lease"]["expires"] = time.time() + lease_seconds
+            self._write("leased", job_id, record)
+            return True
+
+    def complete(self, job_id: str, worker: str, result: Dict) -> bool:
+        """Report a finished job, even if its lease expired meanwhile: the clip is still good.
+
+        The first report wins. Returns False if the job was cancelled or already
+        reported by another worker, in which case nothing is recorded.
+        """
+        with self._locked():
+            record = self._read("leased", job_id) or self._read("pending", job_id)
+            if record is None:
+                return False
+            # Also withdraws a re-dispatched copy, leased or not
+            self._delete("leased", job_id)
+            self._delete("pending", job_id)
+            self._write("done", job_id, {"payload": record["payload"], "result": result})
+            return True
+
+    def fail(self, job_id: str, worker: str, error: str):
+        """Report a failed attempt; the job is retried until it has used max_attempts"""
+        with self._locked():
+            record = self._read("leased", job_id)
+            if record is None or record["lease"]["worker"] != worker:
+                return
+            self._delete("leased", job_id)
+            self._retry(job_id, record, error)
+
+    def _retry(self, job_id: str, record: Dict, error: str):
+        record["attempts"] += 1
+        record["lease"] = None
+        if record["attempts"] >= self.max_attempts:
+            record["error"] = error
+            self._write("failed", job_id, record)
+        else:
+            self._write("pending", job_id, record)
+
+
+class MemoryQueue(WorkQueue):
+    """In-process queue for tests and for workers running as threads of one process.
+
+    Such workers share the process's slide renderers, which take turns
+    (scene_renderers.RENDER_LOCK); their encodes still run in parallel.
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        super().__init__(max_attempts)
+        self._records: Dict[str, Dict[str, Dict]] = {state: {} for state in STATES + ("meta",)}
+        self._lock = threading.RLock()
+
+    def _locked(self):
+        return self._lock
+
+    def _list(self, state: str) -> List[str]:
+        return list(self._records[state])
+
+    def _read(self, state: str, job_id: str) -> Optional[Dict]:
+        record = self._records[state].get(job_id)
+        # Callers modify what they read, like a record loaded from disk
+        return json.loads(json.dumps(record)) if record is not None else None
+
+    def _write(self, state: str, job_id: str, record: Dict):
+        self._records[state][job_id] = json.loads(json.dumps(record))
+
+    def _delete(self, state: str, job_id: str):
+        self._records[state].pop(job_id, None)
+
+
+class FileQueue(WorkQueue):
+    """Queue in a directory on a filesystem every node mounts (NFS, SMB, a cluster FS).
+
+    One JSON file per job in a directory per state, written atomically, with
+    every transition under an exclusive lock on root/lock.
+    """
+
+    def __init__(self, root: str, max_attempts: int = 3):
+        super().__init__(max_attempts)
+        self.root = root
+        for state in STATES + ("meta",):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.root, "lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _path(self, state: str, job_id: str) -> str:
+        return os.path.join(self.root, state, f"{job_id}.json")
+
+    def _list(self, state: str) -> List[str]:
+        return [name[:-len(".json")] for name in os.listdir(os.path.join(self.root, state))
+                if name.endswith(".json") and ".tmp-" not in name]
+
+    def _read(self, state: str, job_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(state, job_id)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, state: str, job_id: str, record: Dict):
+        with atomic_output(self._path(state, job_id)) as tmp_path:
+            with open(tmp_path, "w") as f:
+                json.dump(record, f)
+
+    def _delete(self, state: str, job_id: str):
+        try:
+            os.remove(self._path(state, job_id))
+        except FileNotFoundError:
+            pass
+
+
+class SharedStore:
+    """Directory on shared storage holding narration and scene clips by content key.
+
+    Unlike AssetCache it never evicts: the coordinator reads every clip back, and
+    clips of unchanged scenes are reused by later runs of any node.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.root, key[:2], key + suffix)
+
+    def fetch(self, key: str, suffix: str, dest: str) -> bool:
+        """Download an artifact to dest; False if the store does not have it"""
+        import shutil
+
+        try:
+            with atomic_output(dest) as tmp_path:
+                shutil.copyfile(self._path(key, suffix), tmp_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key: str, suffix: str, src: str) -> str:
+        """Upload an artifact; readers never see it half-written"""
+        import shutil
+
+        path = self._path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_output(path) as tmp_path:
+            shutil.copyfile(src, tmp_path)
+        return path
+
+
+def _job_id(scene_id: int) -> str:
+    return f"scene-{scene_id:05d}"
+
+
+class Coordinator:
+    """Renders a VideoGenerator's scenes on remote workers and assembles the video locally.
+
+    Narration stays on the coordinator: the mastered soundtrack needs all of it and
+    each clip's length follows it. Only video rendering and encoding is distributed.
+    """
+
+    def __init__(self, generator: "VideoGenerator", queue: WorkQueue, store: SharedStore,
+                 poll_interval: float = 1.0, straggler_factor: float = 3.0):
+        self.generator = generator
+        self.queue = queue
+        self.store = store
+        self.poll_interval = poll_interval
+        # A job running this many times longer than the median scene gets a backup copy
+        self.straggler_factor = straggler_factor
+        # Worker-reported render seconds of finished scenes
+        self.render_seconds: List[float] = []
+
+    def spec(self) -> Dict:
+        """What a worker needs to render this job's scenes exactly like a local render"""
+        generator = self.generator
+        settings = {name: getattr(generator, name)
+                    for name in ('renderer', 'still_fps', 'audio_mode', 'width', 'height',
+                                 'fps', 'codec', 'audio_codec', 'timescale', 'chunk_seconds',
+                                 'chunk_threshold', 'gop_seconds')}
+        return {"run": uuid.uuid4().hex, "scenes": generator.scenes, "settings": settings}
+
+    def prepare(self, scene: Dict, run: str) -> Optional[str]:
+        """Narrate a scene and publish its job; returns the clip path if nothing is left to do"""
+        generator = self.generator
+        audio_paths = [generator.generate_audio(scene, language)
+                       for language in generator._language_list()]
+        duration = generator.scene_duration(scene, audio_paths)
+        scene_path = generator._fetch_cached_clip(scene)
+        if scene_path is not None:
+            return scene_path
+
+        clip_key = generator._asset_key('clip', scene)
+        scene_path = generator._scene_path(scene)
+        if self.store.fetch(clip_key, '.mp4', scene_path):
+            print(f"Reusing shared scene {scene['scene_id']}: {scene['title']}")
+            generator._record_artifact('clip', scene, scene_path)
+            return scene_path
+
+        language = generator._language_list()[0]
+        audio_key = generator._asset_key('audio', scene, language)
+        audio_suffix = os.path.splitext(audio_paths[0])[1]
+        self.store.store(audio_key, audio_suffix, audio_paths[0])
+        self.queue.put(_job_id(scene['scene_id']), {
+            "run": run, "scene_id": scene['scene_id'], "clip_key": clip_key,
+            "audio_key": audio_key, "audio_suffix": audio_suffix, "duration": duration})
+        return None
+
+    def render_scenes(self) -> List[str]:
+        """Publish every scene that is not already finished and wait for the workers' clips"""
+        from concurrent.futures import ThreadPoolExecutor
+        from tqdm import tqdm
+
+        generator = self.generator
+        scenes = sorted(generator.scenes, key=lambda scene: scene['scene_id'])
+        spec = self.spec()
+        self.queue.open(spec)
+
+        # Jobs are published as their narration is ready, so workers start right away
+        with ThreadPoolExecutor(max_workers=generator.tts_workers) as executor:
+            ready = list(executor.map(lambda scene: self.prepare(scene, spec["run"]), scenes))
+        paths = {scene['scene_id']: path for scene, path in zip(scenes, ready) if path is not None}
+        outstanding = {scene['scene_id']: scene for scene in scenes if scene['scene_id'] not in paths}
+        # Queue jobs per scene: the original and, for stragglers, a backup copy
+        jobs = {scene_id: {_job_id(scene_id)} for scene_id in outstanding}
+
+        if outstanding:
+            print(f"Published {len(outstanding)} scene jobs, waiting for workers...")
+        progress = tqdm(total=len(scenes), initial=len(paths), desc="Creating scenes (distributed)")
+        try:
+            while outstanding:
+                for job_id in self.queue.expire_leases():
+                    print(f"Lease on {job_id} expired, re-dispatching it")
+                results, failures = self.queue.collect()
+                for job_id, payload, result in results:
+                    # Late duplicates (backup copies, cancelled jobs) are ignored
+                    if payload.get("run") != spec["run"] or payload["scene_id"] not in outstanding:
+                        continue
+                    scene = outstanding.pop(payload["scene_id"])
+                    paths[scene['scene_id']] = self._download(scene, payload)
+                    self.render_seconds.append(result["seconds"])
+                    for other in jobs[scene['scene_id']] - {job_id}:
+                        self.queue.cancel(other)
+                    progress.update()
+                for job_id, payload, error in failures:
+                    scene_id = payload["scene_id"]
+                    jobs[scene_id].discard(job_id)
+                    if scene_id in outstanding and not jobs[scene_id]:
+                        raise RuntimeError(f"Scene {scene_id} failed on every attempt: {error}")
+                self._dispatch_backups(jobs, outstanding)
+                if outstanding:
+                    time.sleep(self.poll_interval)
+        finally:
+            progress.close()
+            self.queue.close()
+        return [paths[scene['scene_id']] for scene in scenes]
+
+    def _download(self, scene: Dict, payload: Dict) -> str:
+        generator = self.generator
+        scene_path = generator._scene_path(scene)
+        if not self.store.fetch(payload["clip_key"], '.mp4', scene_path):
+            raise RuntimeError(f"Clip of scene {scene['scene_id']} is missing from the shared store")
+        generator._record_artifact('clip', scene, scene_path)
+        if generator.cache is not None:
+            generator.cache.store(payload["clip_key"], '.mp4', scene_path)
+        return scene_path
+
+    def _dispatch_backups(self, jobs: Dict[int, set], outstanding: Dict[int, Dict]):
+        """Once the queue is drained, give scenes that run far longer than usual a second worker"""
+        if not self.render_seconds or self.queue.pending():
+            return
+        limit = self.straggler_factor * statistics.median(self.render_seconds)
+        now = time.time()
+        for job_id, record in self.queue.running().items():
+            scene_id = record["payload"]["scene_id"]
+            if scene_id not in outstanding or len(jobs[scene_id]) > 1:
+                continue
+            if now - record["lease"]["claimed"] > limit:
+                backup = f"{_job_id(scene_id)}-backup"
+                print(f"Scene {scene_id} is straggling on {record['lease']['worker']}, "
+                      f"dispatching a backup copy")
+                self.queue.put(backup, record["payload"])
+                jobs[scene_id].add(backup)
+
+    def generate_video(self) -> str:
+        print("Starting distributed video generation...")
+        with span("render_scenes", scenes=len(self.generator.scenes), distributed=True):
+            scene_paths = self.render_scenes()
+        return self.generator.assemble_video(scene_paths)
+
+
+class SceneWorker:
+    """Claims scene jobs, renders them with VideoGenerator.create_scene_video and uploads the clips"""
+
+    def __init__(self, queue: WorkQueue, store: SharedStore, worker_id: Optional[str] = None,
+                 lease_seconds: float = 60.0, poll_interval: float = 1.0,
+                 workspace_root: Optional[str] = None):
+        self.queue = queue
+        self.store = store
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        # Renewed every third of its length while a scene renders
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.workspace_root = workspace_root
+        self._run = None
+        self._generator = None
+        self._scenes: Dict[int, Dict] = {}
+
+    def generator(self, run: str) -> "VideoGenerator":
+        """A renderer configured from the coordinator's spec, rebuilt when a new run starts"""
+        from video_generator import VideoGenerator
+
+        if self._run != run:
+            spec = self.queue.spec()
+            if spec is None or spec["run"] != run:
+                raise RuntimeError(f"Job belongs to run {run}, which is no longer published")
+            settings = dict(spec["settings"])
+            # Narration arrives with each job and clips go to the shared store, so the
+            # worker never synthesizes and keeps no cache of its own
+            generator = VideoGenerator(
+                None, output_path=f"worker-{self.worker_id}.mp4",
+                script_data={"scenes": spec["scenes"]}, cache_dir=None, tts="silent",
+                renderer=settings.pop("renderer"), still_fps=settings.pop("still_fps"),
+                audio_mode=settings.pop("audio_mode"), subtitles=False,
+                workspace_root=self.workspace_root)
+            for name, value in settings.items():
+                setattr(generator, name, value)
+            self._run, self._generator = run, generator
+            self._scenes = {scene['scene_id']: scene for scene in spec["scenes"]}
+        return self._generator
+
+    @contextmanager
+    def _heartbeat(self, job_id: str):
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.lease_seconds / 3):
+                if not self.queue.renew(job_id, self.worker_id, self.lease_seconds):
+                    return
+
+        thread = threading.Thread(target=renew, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def process(self, job_id: str, payload: Dict) -> Dict:
+        generator = self.generator(payload["run"])
+        scene = self._scenes[payload["scene_id"]]
+        audio_path = os.path.join(generator.temp_dir,
+                                  f"audio_{scene['scene_id']}{payload['audio_suffix']}")
+        if not self.store.fetch(payload["audio_key"], payload["audio_suffix"], audio_path):
+            raise RuntimeError(f"Narration of scene {scene['scene_id']} is missing from the shared store")
+
+        start = time.perf_counter()
+        with self._heartbeat(job_id):
+            scene_path = generator.create_scene_video(scene, audio_path, payload["duration"])
+            self.store.store(payload["clip_key"], '.mp4', scene_path)
+        return {"worker": self.worker_id, "seconds": time.perf_counter() - start}
+
+    def run(self, serve: bool = False) -> int:
+        """Work until the coordinator closes the queue (or forever with serve); returns jobs done"""
+        done = 0
+        print(f"Worker {self.worker_id} waiting for scene jobs...")
+        while True:
+            claimed = self.queue.claim(self.worker_id, self.lease_seconds)
+            if claimed is None:
+                if self.queue.closed() and not serve:
+                    return done
+                time.sleep(self.poll_interval)
+                continue
+            job_id, payload = claimed
+            try:
+                result = self.process(job_id, payload)
+            except Exception as error:
+                print(f"Job {job_id} failed on {self.worker_id}: {error}")
+                self.queue.fail(job_id, self.worker_id, f"{type(error).__name__}: {error}")
+                continue
+            self.queue.complete(job_id, self.worker_id, result)
+            done += 1
+
+    def cleanup(self):
+        if self._generator is not None:
+            self._generator.cleanup()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render scene jobs published by a pipeline coordinator")
+    parser.add_argument("--queue", required=True, metavar="DIR", help="Shared job queue directory")
+    parser.add_argument("--store", required=True, metavar="DIR",
+                        help="Shared directory for narration and scene clips")
+    parser.add_argument("--worker-id", help="Name shown in leases (default: host-pid)")
+    parser.add_argument("--lease", type=float, default=60.0,
+                        help="Seconds a claimed job stays leased without a renewal")
+    parser.add_argument("--workspace-root", metavar="DIR", help="Directory for the worker's workspace")
+    parser.add_argument("--serve", action="store_true",
+                        help="Keep waiting for the next run instead of exiting when the queue closes")
+    args = parser.parse_args(argv)
+
+    worker = SceneWorker(FileQueue(args.queue), SharedStore(args.store), worker_id=args.worker_id,
+                         lease_seconds=args.lease, workspace_root=args.workspace_root)
+    try:
+        done = worker.run(serve=args.serve)
+    finally:
+        worker.cleanup()
+    print(f"✓ Worker {worker.worker_id} rendered {done} scenes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import gzip
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+# Bump when text extraction or section parsing changes so stale entries are ignored
+EXTRACTOR_VERSION = 2
+
+DEFAULT_EXTRACTION_CACHE_DIR = os.environ.get(
+    "GAN_VIDEO_EXTRACTION_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "gan_video", "extraction"))
+
+
+def _hash_resources(digest, resources, seen: set):
+    """Add the fonts of a resource dictionary, and the Form XObjects it draws, to digest"""
+    if resources is None:
+        return
+    resources = resources.get_object()
+
+    # Fonts decide how content bytes map to characters
+    fonts = resources.get("/Font")
+    if fonts is not None:
+        fonts = fonts.get_object()
+        for name in sorted(fonts):
+            font = fonts[name].get_object()
+            digest.update(name.encode())
+            digest.update(repr(font.get("/BaseFont")).encode())
+            digest.update(repr(font.get("/Encoding")).encode())
+            to_unicode = font.get("/ToUnicode")
+            if to_unicode is not None:
+                digest.update(to_unicode.get_object().get_data())
+
+    # Text drawn inside forms ("Do" operator) is extracted too; images are not
+    xobjects = resources.get("/XObject")
+    if xobjects is not None:
+        xobjects = xobjects.get_object()
+        for name in sorted(xobjects):
+            xobject = xobjects[name].get_object()
+            if xobject.get("/Subtype") != "/Form" or id(xobject) in seen:
+                continue
+            # Forms shared between pages or drawing each other are hashed once
+            seen.add(id(xobject))
+            digest.update(name.encode())
+            digest.update(xobject.get_data())
+            _hash_resources(digest, xobject.get("/Resources"), seen)
+
+
+def page_fingerprint(page) -> str:
+    """Hash the inputs that determine a PyPDF2 page's extracted text"""
+    digest = hashlib.sha256(f"v{EXTRACTOR_VERSION}".encode())
+
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+
+    _hash_resources(digest, page.get("/Resources"), set())
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk cache of per-page PDF text and parsed sections"""
+
+    def __init__(self, cache_dir: str = DEFAULT_EXTRACTION_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(os.path.join(self.cache_dir, "documents"), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, "pages"), exist_ok=True)
+
+    def document_key(self, pdf_path: str) -> str:
+        """Hash the PDF bytes together with the extractor version"""
+        digest = hashlib.sha256(f"v{EXTRACTOR_VERSION}".encode())
+        with open(pdf_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _read(self, path: str) -> Optional[Dict]:
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Missing or truncated entries are treated as cache misses
+            return None
+
+    def _write(self, path: str, data: Dict):
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _document_path(self, doc_key: str) -> str:
+        return os.path.join(self.cache_dir, "documents", f"{doc_key}.json.gz")
+
+    def _page_path(self, page_key: str) -> str:
+        return os.path.join(self.cache_dir, "pages", f"{page_key}.json.gz")
+
+    def load_page(self, page_key: str) -> Optional[str]:
+        entry = self._read(self._page_path(page_key))
+        return entry["text"] if entry else None
+
+    def store_page(self, page_key: str, text: str):
+        self._write(self._page_path(page_key), {"text": text})
+
+    def load_document(self, doc_key: str) -> Optional[Dict]:
+        """Return {"page_keys": [...], "sections": [...] or None} for a cached document.
+
+        Page text is loaded separately with load_page so callers can stream it.
+        """
+        return self._read(self._document_path(doc_key))
+
+    def store_document(self, doc_key: str, page_keys: List[str],
+                       sections: Optional[List[Dict[str, str]]] = None):
+        self._write(self._document_path(doc_key),
+                    {"page_keys": page_keys, "sections": sections})
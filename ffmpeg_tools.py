@@ -0,0 +1,304 @@
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from fractions import Fraction
+from itertools import repeat
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def ffmpeg_exe() -> str:
+    """Locate the ffmpeg binary (the one bundled for moviepy if available)"""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return shutil.which("ffmpeg") or "ffmpeg"
+
+
+def ffprobe_exe() -> Optional[str]:
+    """Locate ffprobe, which is not shipped with imageio-ffmpeg"""
+    return shutil.which("ffprobe")
+
+
+def _probe_with_ffprobe(path: str) -> Dict:
+    result = subprocess.run(
+        [ffprobe_exe(), "-v", "error", "-print_format", "json", "-show_streams", path],
+        capture_output=True, text=True, check=True)
+
+    info = {}
+    for stream in json.loads(result.stdout).get("streams", []):
+        kind = stream.get("codec_type")
+        if kind == "video" and "video" not in info:
+            info["video"] = {
+                "codec": stream.get("codec_name"),
+                "width": stream.get("width"),
+                "height": stream.get("height"),
+                "pix_fmt": stream.get("pix_fmt"),
+                "fps": stream.get("r_frame_rate"),
+                "time_base": stream.get("time_base"),
+            }
+        elif kind == "audio" and "audio" not in info:
+            info["audio"] = {
+                "codec": stream.get("codec_name"),
+                "sample_rate": int(stream.get("sample_rate", 0)),
+                "channels": stream.get("channels"),
+            }
+    return info
+
+
+def _probe_with_ffmpeg(path: str) -> Dict:
+    # "ffmpeg -i" exits non-zero without an output file but still prints stream info
+    result = subprocess.run([ffmpeg_exe(), "-hide_banner", "-i", path],
+                            capture_output=True, text=True)
+
+    info = {}
+    for line in result.stderr.splitlines():
+        line = line.strip()
+        if not line.startswith("Stream #"):
+            continue
+        video = re.search(r"Video: (\w+).*?, (\w+)(?:\([^)]*\))?, (\d+)x(\d+)", line)
+        if video and "video" not in info:
+            fps = re.search(r"([\d.]+) fps", line)
+            tbn = re.search(r"([\d.]+k?) tbn", line)
+            info["video"] = {
+                "codec": video.group(1),
+                "width": int(video.group(3)),
+                "height": int(video.group(4)),
+                "pix_fmt": video.group(2),
+                "fps": fps.group(1) if fps else None,
+                "time_base": tbn.group(1) if tbn else None,
+            }
+        audio = re.search(r"Audio: (\w+).*?, (\d+) Hz, ([\w.]+)", line)
+        if audio and "audio" not in info:
+            info["audio"] = {
+                "codec": audio.group(1),
+                "sample_rate": int(audio.group(2)),
+                "channels": audio.group(3),
+            }
+
+    if not info:
+        raise RuntimeError(f"Could not read stream information from {path}")
+    return info
+
+
+def probe_streams(path: str) -> Dict:
+    """Return codec parameters of the first video and audio stream in a file"""
+    if ffprobe_exe():
+        return _probe_with_ffprobe(path)
+    return _probe_with_ffmpeg(path)
+
+
+def probe_duration(path: str) -> float:
+    """Container duration in seconds, via ffprobe or the "Duration:" line of ffmpeg -i"""
+    if ffprobe_exe():
+        result = subprocess.run(
+            [ffprobe_exe(), "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, text=True, check=True)
+        return float(result.stdout.strip())
+
+    result = subprocess.run([ffmpeg_exe(), "-hide_banner", "-i", path],
+                            capture_output=True, text=True)
+    match = re.search(r"Duration: (\d+):(\d+):([\d.]+)", result.stderr)
+    if not match:
+        raise RuntimeError(f"Could not read the duration of {path}")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def streams_match(paths: List[str]) -> bool:
+    """Check that all files can be joined without re-encoding"""
+    signatures = [probe_streams(path) for path in paths]
+    for signature in signatures:
+        # Frame rate may differ (still scenes are encoded at a low rate); the
+        # concat demuxer keeps per-file timestamps as long as the time base matches
+        signature.get("video", {}).pop("fps", None)
+    return all(signature == signatures[0] for signature in signatures[1:])
+
+
+def encode_frames(frames: Iterable, width: int, height: int, frame_rate: str,
+                  audio_path: Optional[str], duration: float, output_path: str,
+                  codec: str = "libx264", audio_codec: str = "aac", timescale: int = 90000,
+                  video_args: Sequence[str] = ()):
+    """Pipe raw RGB frames (uint8 arrays of shape (height, width, 3)) into ffmpeg.
+
+    Without an audio_path the clip is video only.
+    """
+    cmd = [ffmpeg_exe(), "-y", "-loglevel", "error",
+           "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+           "-framerate", frame_rate, "-i", "-"]
+    if audio_path:
+        cmd += ["-i", audio_path, "-map", "0:v", "-map", "1:a"]
+    cmd += ["-c:v", codec, *video_args, "-pix_fmt", "yuv420p"]
+    if audio_path:
+        cmd += ["-af", "apad", "-c:a", audio_codec, "-ar", "44100", "-ac", "2"]
+    cmd += ["-t", f"{duration:.6f}", "-video_track_timescale", str(timescale), output_path]
+
+    process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for frame in frames:
+            # Hand ffmpeg the array's buffer directly instead of a bytes copy
+            process.stdin.write(memoryview(frame))
+    except BrokenPipeError:
+        # ffmpeg stopped reading (e.g. -t reached); its exit status tells us if that was an error
+        pass
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read()
+        returncode = process.wait()
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr.decode(errors="replace"))
+
+
+def encode_still_frame(frame, audio_path: Optional[str], duration: float, output_path: str,
+                       still_fps: float = 1.0, codec: str = "libx264", audio_codec: str = "aac",
+                       timescale: int = 90000):
+    """Encode one held frame plus narration, at a low frame rate, as an mp4 clip"""
+    # Pick a frame rate close to still_fps that lands exactly on the clip duration
+    num_frames = max(1, math.ceil(duration * still_fps))
+    rate = (Fraction(num_frames) / Fraction(duration)).limit_denominator(100000)
+
+    encode_frames(repeat(frame, num_frames), frame.shape[1], frame.shape[0],
+                  f"{rate.numerator}/{rate.denominator}", audio_path, duration, output_path,
+                  codec=codec, audio_codec=audio_codec, timescale=timescale,
+                  video_args=["-tune", "stillimage", "-g", str(num_frames), "-bf", "0"])
+
+
+def chunk_ranges(num_frames: int, chunk_frames: int, gop: int) -> List[Tuple[int, int]]:
+    """Split frames [0, num_frames) into chunks whose lengths are whole GOPs (except the last)"""
+    chunk_frames = max(gop, chunk_frames // gop * gop)
+    return [(start, min(start + chunk_frames, num_frames))
+            for start in range(0, num_frames, chunk_frames)]
+
+
+def encode_frames_chunked(frames_for: Callable[[int, int], Iterable], num_frames: int,
+                          width: int, height: int, fps: int, audio_path: Optional[str],
+                          duration: float, output_path: str, chunk_frames: int, gop: int,
+                          workers: int = 1, codec: str = "libx264", audio_codec: str = "aac",
+                          timescale: int = 90000):
+    """Encode a long clip as GOP-aligned chunks in parallel and join them by stream copy.
+
+    frames_for(start, end) yields the frames of one chunk. Every chunk uses the same
+    fixed GOP and starts on a keyframe, so the joined stream has the keyframe cadence
+    of a single encode. Audio is encoded once over the joined video: separately
+    encoded AAC chunks would each start with priming silence.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    ranges = chunk_ranges(num_frames, chunk_frames, gop)
+    chunk_dir = tempfile.mkdtemp(prefix=".tmp-chunks-", dir=os.path.dirname(output_path) or ".")
+    chunk_paths = [os.path.join(chunk_dir, f"chunk_{index:04d}.mp4") for index in range(len(ranges))]
+    video_args = ["-g", str(gop), "-keyint_min", str(gop),
+                  "-force_key_frames", f"expr:eq(mod(n,{gop}),0)"]
+
+    def encode_chunk(index: int):
+        start, end = ranges[index]
+        # The last chunk ends exactly at the clip duration, not on a frame boundary
+        chunk_duration = (duration - start / fps) if end == num_frames else (end - start) / fps
+        encode_frames(frames_for(start, end), width, height, str(fps), None, chunk_duration,
+                      chunk_paths[index], codec=codec, timescale=timescale,
+                      video_args=video_args)
+
+    try:
+        # Each chunk is its own ffmpeg process; threads just feed their pipes
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(ranges)))) as executor:
+            list(executor.map(encode_chunk, range(len(ranges))))
+        if audio_path:
+            video_path = os.path.join(chunk_dir, "video.mp4")
+            concat_stream_copy(chunk_paths, video_path)
+            add_audio_track(video_path, audio_path, duration, output_path,
+                            audio_codec=audio_codec, timescale=timescale)
+        else:
+            concat_stream_copy(chunk_paths, output_path)
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+
+
+def add_audio_track(video_path: str, audio_path: str, duration: float, output_path: str,
+                    audio_codec: str = "aac", timescale: int = 90000):
+    """Copy a video-only file's video and encode audio_path as its (padded) audio track"""
+    subprocess.run(
+        [ffmpeg_exe(), "-y", "-loglevel", "error", "-i", video_path, "-i", audio_path,
+         "-map", "0:v", "-map", "1:a", "-c:v", "copy",
+         "-af", "apad", "-c:a", audio_codec, "-ar", "44100", "-ac", "2",
+         "-t", f"{duration:.6f}", "-video_track_timescale", str(timescale), output_path],
+        capture_output=True, text=True, check=True)
+
+
+def concat_stream_copy(paths: List[str], output_path: str):
+    """Join clips with identical parameters using the ffmpeg concat demuxer"""
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+        for path in paths:
+            # The concat demuxer list format escapes single quotes as '\''
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            list_file.write(f"file '{escaped}'\n")
+
+    try:
+        subprocess.run(
+            [ffmpeg_exe(), "-y", "-loglevel", "error",
+             "-f", "concat", "-safe", "0", "-i", list_file.name,
+             "-c", "copy", "-movflags", "+faststart", output_path],
+            capture_output=True, text=True, check=True)
+    finally:
+        os.remove(list_file.name)
+
+
+# ISO 639-2 codes for the stream language tag (MP4 stores three-letter codes)
+_ISO_639_2 = {
+    "ar": "ara", "cs": "ces", "da": "dan", "de": "deu", "el": "ell", "en": "eng",
+    "es": "spa", "fi": "fin", "fr": "fra", "he": "heb", "hi": "hin", "hu": "hun",
+    "id": "ind", "it": "ita", "ja": "jpn", "ko": "kor", "nl": "nld", "no": "nor",
+    "pl": "pol", "pt": "por", "ro": "ron", "ru": "rus", "sv": "swe", "th": "tha",
+    "tr": "tur", "uk": "ukr", "vi": "vie", "zh": "zho",
+}
+
+
+def language_tag(language: str) -> str:
+    """Three-letter stream language tag for a code such as de or pt-BR"""
+    base = language.split("-")[0].split("_")[0].lower()
+    return _ISO_639_2.get(base, base)
+
+
+def mux_audio(video_path: str, audio_paths: List[str], output_path: str,
+              languages: Optional[List[str]] = None):
+    """Combine a video-only file with audio tracks, copying every stream.
+
+    With several tracks the first is marked as the default; languages tag each
+    track so players can offer a language menu.
+    """
+    command = [ffmpeg_exe(), "-y", "-loglevel", "error", "-i", video_path]
+    for audio_path in audio_paths:
+        command += ["-i", audio_path]
+    command += ["-map", "0:v"]
+    for index in range(len(audio_paths)):
+        command += ["-map", f"{index + 1}:a"]
+    for index, language in enumerate(languages or []):
+        command += [f"-metadata:s:a:{index}", f"language={language_tag(language)}"]
+    for index in range(len(audio_paths)):
+        command += [f"-disposition:a:{index}", "default" if index == 0 else "0"]
+    command += ["-c", "copy", "-movflags", "+faststart", output_path]
+    subprocess.run(command, capture_output=True, text=True, check=True)
+
+
+def mux_subtitles(video_path: str, subtitle_paths: List[str], output_path: str,
+                  languages: Optional[List[str]] = None):
+    """Replace a file's subtitle tracks with soft mov_text tracks, copying audio and video"""
+    command = [ffmpeg_exe(), "-y", "-loglevel", "error", "-i", video_path]
+    for subtitle_path in subtitle_paths:
+        command += ["-i", subtitle_path]
+    command += ["-map", "0", "-map", "-0:s"]
+    for index in range(len(subtitle_paths)):
+        command += ["-map", f"{index + 1}:s"]
+    for index, language in enumerate(languages or []):
+        command += [f"-metadata:s:s:{index}", f"language={language_tag(language)}"]
+    # MP4 carries text subtitles as mov_text; only the subtitle streams are converted
+    command += ["-c", "copy", "-c:s", "mov_text", "-movflags", "+faststart", output_path]
+    subprocess.run(command, capture_output=True, text=True, check=True)
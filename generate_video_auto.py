@@ -5,71 +5,45 @@ Generates the video without user interaction
 """
 
 import os
-import subprocess
 import sys
-
-def install_dependencies():
-    """Install required dependencies"""
-    print("Installing dependencies...")
-    deps = [
-        "pillow",
-        "matplotlib", 
-        "gtts",
-        "moviepy",
-        "opencv-python",
-        "numpy",
-        "tqdm"
-    ]
-    
-    for dep in deps:
-        print(f"Installing {dep}...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "--break-system-packages", dep], 
-                      capture_output=True)
-    
-    print("✓ Dependencies installed")
+from pipeline import Pipeline, check_dependencies
 
 def main():
     print("=== Automated GaN Video Generation ===")
     
-    # Install dependencies first
-    install_dependencies()
-    
-    # Import after installation
-    from pdf_extractor import PDFExtractor
-    from script_generator import ScriptGenerator
-    from video_generator import VideoGenerator
+    # Check dependencies (cached, so this takes milliseconds after the first run)
+    missing = check_dependencies()
+    if missing:
+        print(f"Missing dependencies: {', '.join(missing)}")
+        print("Install them with: pip3 install --break-system-packages -r requirements.txt")
+        return 1
+    print("✓ Dependencies available")
     
     pdf_path = "/workspace/GaN Overview.pdf"
     
+    # For automated version, let's create a shorter preview
+    # Limit to first 3 scenes for faster generation
+    # A rerun after a failure continues from the scenes that were already finished
+    pipeline = Pipeline(pdf_path, script_path="video_script.json", max_scenes=3, resume=True)
+    
     # Step 1: Extract PDF content
     print("\n1. Extracting PDF content...")
-    extractor = PDFExtractor(pdf_path)
-    text = extractor.extract_text()
-    print(f"   ✓ Extracted {len(text)} characters")
+    pipeline.extract()
     
-    # Step 2: Generate script
+    # Step 2: Generate script (reuses the extracted sections)
     print("\n2. Generating video script...")
-    script_gen = ScriptGenerator(pdf_path)
-    script = script_gen.generate_script()
-    script_gen.save_script("video_script.json")
-    print(f"   ✓ Generated {len(script)} scenes")
+    pipeline.script()
     
     # Step 3: Generate video
     print("\n3. Creating video (this may take a few minutes)...")
     try:
-        video_gen = VideoGenerator("video_script.json")
-        
-        # For automated version, let's create a shorter preview
-        # Limit to first 3 scenes for faster generation
-        video_gen.scenes = video_gen.scenes[:3]
-        
-        output_path = video_gen.generate_video()
+        output_path = pipeline.render()
         print(f"\n✓ Video created successfully!")
         print(f"  Output: {os.path.abspath(output_path)}")
-        print(f"  Duration: ~{sum(s['duration'] for s in video_gen.scenes)} seconds")
+        print(f"  Duration: ~{sum(s['duration'] for s in pipeline.video_generator.scenes)} seconds")
         
         # Auto cleanup
-        video_gen.cleanup()
+        pipeline.cleanup()
         
     except Exception as e:
         print(f"\nError: {e}")
@@ -80,4 +54,4 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
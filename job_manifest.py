@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+MANIFEST_VERSION = 1
+
+# Marks files that are still being written; they never replace a finished artifact
+_PARTIAL_MARKER = ".tmp-"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def atomic_output(path: str):
+    """Yield a private path to write to; it replaces path only if the block succeeds.
+
+    The temporary name keeps the extension, so tools that pick a format from it
+    (ffmpeg, gTTS) behave the same. A killed writer leaves only a .tmp- file behind.
+    """
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}{_PARTIAL_MARKER}{os.getpid()}-{threading.get_ident()}{ext}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def remove_partial_files(directory: str) -> int:
+    """Delete leftovers of interrupted atomic writes; returns how many were removed"""
+    removed = 0
+    for name in os.listdir(directory):
+        if _PARTIAL_MARKER in name:
+            try:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+class JobManifest:
+    """Completed artifacts of one render job, with checksums and input hashes.
+
+    Lives in the job's working directory. An artifact is reused on resume only
+    if its inputs are unchanged and the file still matches its recorded checksum.
+    """
+
+    def __init__(self, path: str, resume: bool = True):
+        self.path = path
+        self.artifacts: Dict[str, Dict] = {}
+        # Artifacts verified or recorded by this process, to skip re-hashing them
+        self._current: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Saves are serialized so an older snapshot never replaces a newer one
+        self._save_lock = threading.Lock()
+        if resume:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("version") == MANIFEST_VERSION:
+            self.artifacts = data.get("artifacts", {})
+
+    def save(self):
+        with self._save_lock:
+            with self._lock:
+                data = {"version": MANIFEST_VERSION, "artifacts": dict(self.artifacts)}
+            with atomic_output(self.path) as tmp_path:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    def verify(self, name: str, path: str, input_key: str) -> bool:
+        """True if path holds the finished artifact for these inputs"""
+        with self._lock:
+            entry = self.artifacts.get(name)
+            if self._current.get(name) == input_key:
+                return entry is not None and os.path.exists(path)
+        if entry is None or entry["input"] != input_key or entry["path"] != path:
+            return False
+        try:
+            if os.path.getsize(path) != entry["size"] or file_sha256(path) != entry["sha256"]:
+                return False
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self._current[name] = input_key
+        return True
+
+    def record(self, name: str, path: str, input_key: str):
+        """Add a finished artifact and persist the manifest"""
+        with self._lock:
+            if self._current.get(name) == input_key and name in self.artifacts:
+                return
+        entry = {"path": path, "input": input_key, "size": os.path.getsize(path),
+                 "sha256": file_sha256(path)}
+        with self._lock:
+            self.artifacts[name] = entry
+            self._current[name] = input_key
+        self.save()
+
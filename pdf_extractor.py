@@ -1,27 +1,172 @@
-import PyPDF2
 import re
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import os
+from extraction_cache import DEFAULT_EXTRACTION_CACHE_DIR, ExtractionCache, page_fingerprint
+from tracing import get_tracer, merge_traced, run_traced, span
+
+# PyPDF2 is imported only when pages actually need extracting; cached documents never load it
+
+def _extract_page_list(pdf_path: str, page_nums: List[int]) -> List[str]:
+    """Extract the text of the given pages in a worker process"""
+    import PyPDF2
+    
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        texts = []
+        for page_num in page_nums:
+            with span("extract_page", page=page_num):
+                texts.append(pdf_reader.pages[page_num].extract_text())
+        return texts
+
+def _page_bounds(num_pages: int, page_range: Optional[Tuple[int, int]],
+                 max_pages: Optional[int]) -> Tuple[int, int]:
+    start, end = page_range or (0, num_pages)
+    end = min(end, num_pages)
+    if max_pages is not None:
+        end = min(end, start + max_pages)
+    return start, end
 
 class PDFExtractor:
-    def __init__(self, pdf_path: str):
+    def __init__(self, pdf_path: str, workers: int = 1,
+                 cache_dir: Optional[str] = DEFAULT_EXTRACTION_CACHE_DIR):
         self.pdf_path = pdf_path
+        # Number of processes used to extract pages (1 = serial)
+        self.workers = max(1, workers)
+        # Persistent per-page text cache (None disables it)
+        self.cache = ExtractionCache(cache_dir) if cache_dir else None
         self.text_content = ""
+        self.pages = []
         self.sections = []
+        self._doc_key = None
+        self._page_keys = None
+        self._cached_sections = None
+    
+    def _load_cached_document(self) -> Optional[Dict]:
+        if self.cache is None:
+            return None
+        if self._doc_key is None:
+            self._doc_key = self.cache.document_key(self.pdf_path)
+        return self.cache.load_document(self._doc_key)
+        
+    def extract_pages(self) -> List[str]:
+        """Extract the text of every page, in page order"""
+        entry = self._load_cached_document()
+        if entry is not None:
+            pages = [self.cache.load_page(page_key) for page_key in entry["page_keys"]]
+            if None not in pages:
+                # Unchanged document: PyPDF2 is not needed at all
+                print(f"Loaded {len(pages)} pages from the extraction cache")
+                self.pages = pages
+                self._page_keys = entry["page_keys"]
+                self._cached_sections = entry.get("sections")
+                return self.pages
+        
+        import PyPDF2
+        
+        with open(self.pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            num_pages = len(pdf_reader.pages)
+            page_keys = ([page_fingerprint(page) for page in pdf_reader.pages]
+                         if self.cache is not None else None)
+        
+        pages = [None] * num_pages
+        if page_keys is not None:
+            # Reuse pages whose content is unchanged from any earlier extraction
+            pages = [self.cache.load_page(page_key) for page_key in page_keys]
+        missing = [page_num for page_num, text in enumerate(pages) if text is None]
+        
+        if len(missing) == num_pages:
+            print(f"Extracting text from {num_pages} pages...")
+        else:
+            print(f"Extracting text from {len(missing)} of {num_pages} pages (rest cached)...")
+        
+        with span("extract", pages=len(missing)):
+            extracted = self._extract_pages(missing)
+        for page_num, text in zip(missing, extracted):
+            pages[page_num] = text
+            if page_keys is not None:
+                self.cache.store_page(page_keys[page_num], text)
+        
+        self.pages = pages
+        if page_keys is not None:
+            self._page_keys = page_keys
+            self.cache.store_document(self._doc_key, page_keys)
+        return self.pages
+    
+    def _extract_pages(self, page_nums: List[int]) -> List[str]:
+        """Extract the given pages serially or sharded across a process pool"""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        if self.workers == 1 or len(page_nums) < 2:
+            return _extract_page_list(self.pdf_path, page_nums)
+        
+        # Several shards per worker keeps the pool busy when pages differ in cost
+        shard_size = max(1, -(-len(page_nums) // (self.workers * 4)))
+        shards = [page_nums[start:start + shard_size]
+                  for start in range(0, len(page_nums), shard_size)]
+        
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards))) as executor:
+            traced = get_tracer() is not None
+            results = executor.map(run_traced, [traced] * len(shards),
+                                   [_extract_page_list] * len(shards),
+                                   [self.pdf_path] * len(shards), shards)
+            return [text for outcome in results for text in merge_traced(outcome)]
+    
+    def iter_pages(self, page_range: Optional[Tuple[int, int]] = None,
+                   max_pages: Optional[int] = None) -> Iterator[str]:
+        """Lazily yield page text, optionally limited to pages [start, end) or a page budget"""
+        resume_at = 0
+        entry = self._load_cached_document()
+        if entry is not None:
+            page_keys = entry["page_keys"]
+            start, end = _page_bounds(len(page_keys), page_range, max_pages)
+            resume_at = start
+            for page_key in page_keys[start:end]:
+                text = self.cache.load_page(page_key)
+                if text is None:
+                    break
+                yield text
+                resume_at += 1
+            else:
+                return
+        
+        # Fall back to PyPDF2 for uncached documents (or the rest of a partly cached one)
+        import PyPDF2
         
+        with open(self.pdf_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            num_pages = len(pdf_reader.pages)
+            start, end = _page_bounds(num_pages, page_range, max_pages)
+            # Keys for a document entry, written once every page has been read
+            page_keys = [] if entry is None and self.cache is not None else None
+            
+            for page_num in range(max(start, resume_at), end):
+                page = pdf_reader.pages[page_num]
+                if self.cache is None:
+                    with span("extract_page", page=page_num):
+                        text = page.extract_text()
+                    yield text
+                    continue
+                
+                page_key = page_fingerprint(page)
+                if page_keys is not None:
+                    page_keys.append(page_key)
+                text = self.cache.load_page(page_key)
+                if text is None:
+                    with span("extract_page", page=page_num):
+                        text = page.extract_text()
+                    self.cache.store_page(page_key, text)
+                yield text
+        
+        if page_keys is not None and len(page_keys) == num_pages:
+            self._page_keys = page_keys
+            self.cache.store_document(self._doc_key, page_keys)
+    
     def extract_text(self) -> str:
         """Extract all text from the PDF"""
         try:
-            with open(self.pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                print(f"Extracting text from {num_pages} pages...")
-                
-                for page_num in range(num_pages):
-                    page = pdf_reader.pages[page_num]
-                    self.text_content += page.extract_text() + "\n"
-                    
+            pages = self.extract_pages()
+            self.text_content = "".join(page + "\n" for page in pages)
             return self.text_content
         except Exception as e:
             print(f"Error extracting PDF: {e}")
@@ -29,28 +174,48 @@ class PDFExtractor:
     
     def parse_sections(self) -> List[Dict[str, str]]:
         """Parse the extracted text into logical sections"""
-        lines = self.text_content.split('\n')
-        current_section = {"title": "Introduction", "content": ""}
+        if self._cached_sections is not None:
+            self.sections.extend(self._cached_sections)
+            return self.sections
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Detect section headers (lines in all caps or with specific patterns)
-            if self._is_section_header(line):
-                if current_section["content"]:
-                    self.sections.append(current_section)
-                current_section = {"title": line, "content": ""}
-            else:
-                current_section["content"] += line + " "
+        with span("parse"):
+            self.sections.extend(self.iter_sections(self.pages or [self.text_content]))
         
-        # Add the last section
-        if current_section["content"]:
-            self.sections.append(current_section)
-            
+        if self.cache is not None and self._page_keys is not None:
+            self.cache.store_document(self._doc_key, self._page_keys, self.sections)
         return self.sections
     
+    def iter_sections(self, pages: Optional[Iterable[str]] = None) -> Iterator[Dict[str, str]]:
+        """Yield sections one by one as soon as they are complete.
+        
+        Reads pages lazily from the PDF when none are given, so memory is bounded
+        by the largest section and callers can stop reading early.
+        """
+        if pages is None:
+            pages = self.iter_pages()
+        
+        title = "Introduction"
+        content = []
+        
+        for page in pages:
+            for line in page.split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
+                    
+                # Detect section headers (lines in all caps or with specific patterns)
+                if self._is_section_header(line):
+                    if content:
+                        yield {"title": title, "content": "".join(content)}
+                    title = line
+                    content = []
+                else:
+                    content.append(line + " ")
+        
+        # Add the last section
+        if content:
+            yield {"title": title, "content": "".join(content)}
+    
     def _is_section_header(self, line: str) -> bool:
         """Determine if a line is likely a section header"""
         # Check if line is all caps and reasonably short
@@ -70,7 +235,8 @@ class PDFExtractor:
     def get_summary(self, max_sections: int = 5) -> List[Dict[str, str]]:
         """Get a summary of the most important sections"""
         if not self.sections:
-            self.extract_text()
+            if not self.pages:
+                self.extract_text()
             self.parse_sections()
             
         # Prioritize sections with substantial content
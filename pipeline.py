@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+GaN Video Pipeline
+Runs extract -> script -> render in one process, passing results between stages in memory
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+from tts_backends import TTS_BACKENDS
+from workspace import HostScheduler, tmpfs_root
+
+# Modules each stage imports, mapped to the pip package that provides them
+STAGE_DEPENDENCIES = {
+    "extract": {"PyPDF2": "PyPDF2"},
+    "script": {},
+    "render": {
+        "numpy": "numpy",
+        "PIL": "pillow",
+        "matplotlib": "matplotlib",
+        "moviepy": "moviepy",
+        "tqdm": "tqdm",
+    },
+    # Only needed when narration uses the gTTS backend
+    "gtts": {"gtts": "gtts"},
+}
+
+DEPENDENCY_STAMP = os.path.join(os.path.expanduser("~"), ".cache", "gan_video", "dependencies.json")
+
+
+def _environment_key(modules: List[str]) -> str:
+    """Identify the interpreter and installed packages without importing anything"""
+    digest = hashlib.sha256()
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    digest.update(",".join(sorted(modules)).encode())
+    for path in sys.path:
+        if os.path.isdir(path):
+            # Installing or removing a package touches its site-packages directory
+            digest.update(f"{path}:{os.stat(path).st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def check_dependencies(stages: List[str] = ("extract", "script", "render", "gtts")) -> List[str]:
+    """Return the pip packages missing for the given stages.
+
+    Uses importlib.util.find_spec (no imports), and remembers a passing check
+    for the current environment so later runs skip even that.
+    """
+    modules = {module: package
+               for stage in stages
+               for module, package in STAGE_DEPENDENCIES[stage].items()}
+    key = _environment_key(list(modules))
+
+    try:
+        with open(DEPENDENCY_STAMP) as f:
+            if key in json.load(f).get("ok", []):
+                return []
+    except (OSError, ValueError):
+        pass
+
+    missing = sorted({package for module, package in modules.items()
+                      if importlib.util.find_spec(module) is None})
+
+    if not missing:
+        try:
+            os.makedirs(os.path.dirname(DEPENDENCY_STAMP), exist_ok=True)
+            with open(DEPENDENCY_STAMP, "w") as f:
+                json.dump({"ok": [key]}, f)
+        except OSError:
+            pass
+    return missing
+
+
+class Pipeline:
+    """Extract a PDF, write a script and render the video without redundant work between stages"""
+
+    def __init__(self, pdf_path: str, output_path: str = "gan_overview_video.mp4",
+                 script_path: Optional[str] = None, max_sections: int = 10,
+                 max_scenes: Optional[int] = None, extract_workers: int = 1,
+                 render_workers: int = 1, keep_assets: bool = False,
+                 tts: str = "gtts", tts_workers: Optional[int] = None,
+                 audio_mode: str = "master", music_path: Optional[str] = None,
+                 subtitles: bool = True, trace_path: Optional[str] = None,
+                 metrics_path: Optional[str] = None, resume: bool = False,
+                 workspace_root: Optional[str] = None, disk_quota_bytes: Optional[int] = None,
+                 scheduler: Optional[HostScheduler] = None, queue_dir: Optional[str] = None,
+                 store_dir: Optional[str] = None, chunk_seconds: float = 20.0,
+                 chunk_threshold: float = 60.0):
+        self.pdf_path = pdf_path
+        self.output_path = output_path
+        # Only write the script JSON when a path is given
+        self.script_path = script_path
+        self.max_sections = max_sections
+        self.max_scenes = max_scenes
+        self.extract_workers = extract_workers
+        self.render_workers = render_workers
+        self.keep_assets = keep_assets
+        self.tts = tts
+        self.tts_workers = tts_workers
+        self.audio_mode = audio_mode
+        self.music_path = music_path
+        self.subtitles = subtitles
+        # Chrome trace JSON and Prometheus text outputs; tracing is off unless one is set
+        self.trace_path = trace_path
+        self.metrics_path = metrics_path
+        # Continue an interrupted render from its job manifest
+        self.resume = resume
+        # Where per-job workspaces are created (e.g. tmpfs) and how large one may grow
+        self.workspace_root = workspace_root
+        self.disk_quota_bytes = disk_quota_bytes
+        # Host-wide CPU/disk admission shared with other jobs (None = start right away)
+        self.scheduler = scheduler
+        # Distributed mode: publish scene jobs to this queue for workers on other nodes
+        # (see distributed.py), which upload clips to the shared store
+        self.queue_dir = queue_dir
+        self.store_dir = store_dir
+        # Long scenes are encoded as parallel chunks of this length
+        self.chunk_seconds = chunk_seconds
+        self.chunk_threshold = chunk_threshold
+
+        self.extractor = None
+        self.script_data = None
+        self.video_generator = None
+
+    def extract(self):
+        """Extract and parse the PDF once"""
+        from pdf_extractor import PDFExtractor
+
+        self.extractor = PDFExtractor(self.pdf_path, workers=self.extract_workers)
+        text = self.extractor.extract_text()
+        self.extractor.parse_sections()
+        print(f"✓ Extracted {len(text)} characters, {len(self.extractor.sections)} sections")
+        return self.extractor
+
+    def script(self) -> Dict:
+        """Build the video script from the already extracted sections"""
+        from script_generator import ScriptGenerator
+        from tracing import span
+
+        if self.extractor is None:
+            self.extract()
+
+        script_gen = ScriptGenerator(self.pdf_path, extractor=self.extractor)
+        with span("generate_script"):
+            script_gen.generate_script(max_sections=self.max_sections)
+
+        if self.script_path:
+            self.script_data = script_gen.save_script(self.script_path)
+        else:
+            self.script_data = script_gen.build_script_data()
+        print(f"✓ Generated script with {self.script_data['scene_count']} scenes")
+        return self.script_data
+
+    def render(self) -> str:
+        """Render the video from the in-memory script"""
+        from video_generator import VideoGenerator
+
+        if self.script_data is None:
+            self.script()
+
+        self.video_generator = VideoGenerator(self.script_path, self.output_path,
+                                              workers=self.render_workers,
+                                              script_data=self.script_data,
+                                              keep_assets=self.keep_assets,
+                                              tts=self.tts, tts_workers=self.tts_workers,
+                                              audio_mode=self.audio_mode,
+                                              music_path=self.music_path,
+                                              subtitles=self.subtitles, resume=self.resume,
+                                              workspace_root=self.workspace_root,
+                                              disk_quota_bytes=self.disk_quota_bytes,
+                                              chunk_seconds=self.chunk_seconds,
+                                              chunk_threshold=self.chunk_threshold)
+        if self.max_scenes is not None:
+            # Preview renders: keep the full script but only render its first scenes
+            self.video_generator.scenes = self.video_generator.scenes[:self.max_scenes]
+        generate = self.video_generator.generate_video
+        if self.queue_dir:
+            from distributed import Coordinator, FileQueue, SharedStore
+
+            generate = Coordinator(self.video_generator, FileQueue(self.queue_dir),
+                                   SharedStore(self.store_dir)).generate_video
+        if self.scheduler is None:
+            return generate()
+        # Without a quota, reserve what the job is expected to write
+        disk_bytes = self.disk_quota_bytes or self.video_generator.estimate_disk_bytes()
+        with self.scheduler.slot(cpus=self.render_workers, disk_bytes=disk_bytes,
+                                 name=os.path.basename(self.output_path)):
+            return generate()
+
+    def run(self, render: bool = True) -> Optional[str]:
+        """Run every stage and return the path of the rendered video (None without render)"""
+        from tracing import disable_tracing, enable_tracing
+
+        if self.trace_path or self.metrics_path:
+            enable_tracing()
+        try:
+            self.extract()
+            self.script()
+            return self.render() if render else None
+        finally:
+            self.write_trace(disable_tracing())
+
+    def write_trace(self, tracer):
+        """Write what the tracer recorded to the configured trace and metrics files"""
+        if tracer is None:
+            return
+        if self.trace_path:
+            tracer.write_chrome_trace(self.trace_path)
+            print(f"✓ Trace written to {self.trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+        if self.metrics_path:
+            tracer.write_prometheus(self.metrics_path)
+            print(f"✓ Stage metrics written to {self.metrics_path}")
+
+    def cleanup(self):
+        """Remove temporary render assets"""
+        if self.video_generator is not None:
+            self.video_generator.cleanup()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Create a narrated explainer video from a PDF")
+    parser.add_argument("pdf", help="Source PDF file")
+    parser.add_argument("-o", "--output", default="gan_overview_video.mp4", help="Output video path")
+    parser.add_argument("--save-script", metavar="PATH",
+                        help="Also write the generated script JSON to PATH")
+    parser.add_argument("--max-sections", type=int, default=10,
+                        help="Number of PDF sections to consider for scenes")
+    parser.add_argument("--max-scenes", type=int, help="Only render the first N scenes")
+    parser.add_argument("--extract-workers", type=int, default=1,
+                        help="Processes used for PDF text extraction")
+    parser.add_argument("--workers", type=int, default=1, help="Processes used for scene rendering")
+    parser.add_argument("--tts", default="gtts", choices=sorted(TTS_BACKENDS),
+                        help="Narration engine (espeak and silent work offline)")
+    parser.add_argument("--tts-workers", type=int,
+                        help="Narrations synthesized at once (default depends on the engine)")
+    parser.add_argument("--audio-mode", default="master", choices=["master", "per-scene"],
+                        help="One normalized soundtrack for the video, or AAC audio in every scene clip")
+    parser.add_argument("--music", metavar="PATH",
+                        help="Background music, looped and ducked under the narration")
+    parser.add_argument("--no-subtitles", action="store_true",
+                        help="Skip the WebVTT/SRT captions and the soft subtitle track")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reuse verified scenes and narration from an interrupted run")
+    parser.add_argument("--workspace-root", metavar="DIR",
+                        help="Directory for per-job workspaces (default: temp_video_assets)")
+    parser.add_argument("--tmpfs", action="store_true",
+                        help="Put the job workspace on tmpfs (/dev/shm) when available")
+    parser.add_argument("--disk-quota", type=int, metavar="MB",
+                        help="Fail the job if its workspace grows past this size")
+    parser.add_argument("--host-cpus", type=int,
+                        help="Wait until running jobs on this host use fewer than this many CPUs")
+    parser.add_argument("--host-disk", type=int, metavar="MB",
+                        help="Wait until the disk quotas of running jobs leave room for this one")
+    parser.add_argument("--chunk-seconds", type=float, default=20.0,
+                        help="Encode long scenes as parallel chunks of this length (0 disables)")
+    parser.add_argument("--chunk-threshold", type=float, default=60.0,
+                        help="Scenes longer than this many seconds are encoded in chunks")
+    parser.add_argument("--queue", metavar="DIR",
+                        help="Render scenes on distributed workers through this shared job queue")
+    parser.add_argument("--store", metavar="DIR",
+                        help="Shared directory where distributed workers upload scene clips")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="Record per-stage and per-scene spans as Chrome trace JSON")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Write per-stage wall/CPU time and peak RSS in Prometheus text format")
+    parser.add_argument("--script-only", action="store_true",
+                        help="Stop after generating the script")
+    parser.add_argument("--keep-assets", action="store_true",
+                        help="Write scene images as PNG to the temp directory for debugging")
+    parser.add_argument("--cleanup", action="store_true",
+                        help="Remove temporary render assets afterwards")
+    args = parser.parse_args(argv)
+
+    stages = ["extract", "script"] if args.script_only else ["extract", "script", "render"]
+    if not args.script_only and args.tts == "gtts":
+        stages.append("gtts")
+    missing = check_dependencies(stages)
+    if missing:
+        print(f"Missing dependencies: {', '.join(missing)}")
+        print("Install them with: pip3 install --break-system-packages -r requirements.txt")
+        return 1
+
+    if bool(args.queue) != bool(args.store):
+        print("Error: --queue and --store must be given together")
+        return 1
+
+    if not os.path.exists(args.pdf):
+        print(f"Error: PDF file not found at {args.pdf}")
+        return 1
+
+    workspace_root = args.workspace_root
+    if args.tmpfs:
+        workspace_root = tmpfs_root()
+        if workspace_root is None:
+            print("No tmpfs found, using the default workspace directory")
+            workspace_root = args.workspace_root
+    disk_quota_bytes = args.disk_quota * 1024 ** 2 if args.disk_quota else None
+    scheduler = None
+    if args.host_cpus or args.host_disk:
+        scheduler = HostScheduler(max_cpus=args.host_cpus,
+                                  max_disk_bytes=args.host_disk * 1024 ** 2 if args.host_disk else None)
+
+    pipeline = Pipeline(args.pdf, args.output, script_path=args.save_script,
+                        max_sections=args.max_sections, max_scenes=args.max_scenes,
+                        extract_workers=args.extract_workers, render_workers=args.workers,
+                        keep_assets=args.keep_assets, tts=args.tts,
+                        tts_workers=args.tts_workers, audio_mode=args.audio_mode,
+                        music_path=args.music, subtitles=not args.no_subtitles,
+                        trace_path=args.trace, metrics_path=args.metrics, resume=args.resume,
+                        workspace_root=workspace_root, disk_quota_bytes=disk_quota_bytes,
+                        scheduler=scheduler, queue_dir=args.queue, store_dir=args.store,
+                        chunk_seconds=args.chunk_seconds, chunk_threshold=args.chunk_threshold)
+
+    if args.script_only:
+        pipeline.run(render=False)
+        return 0
+
+    output_path = pipeline.run()
+    print(f"✓ Video created: {os.path.abspath(output_path)}")
+
+    if args.cleanup:
+        pipeline.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
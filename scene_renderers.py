@@ -0,0 +1,538 @@
+from typing import Dict, Optional, Set, Tuple, Type
+import importlib.util
+import os
+import threading
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Background colour shared by every slide
+BACKGROUND = '#0a0a0a'
+
+# Diagram drawn behind the title of each scene
+DIAGRAM_TYPES = ('crystal', 'applications', 'hemt', 'performance', 'tech')
+
+
+def diagram_type(scene: Dict) -> str:
+    """Pick the diagram for a scene: an explicit 'diagram' entry, else keywords in the title"""
+    if scene.get('diagram') in DIAGRAM_TYPES:
+        return scene['diagram']
+    
+    title = scene['title'].lower()
+    if "introduction" in title:
+        return 'crystal'
+    elif "application" in title:
+        return 'applications'
+    elif "structure" in title or "architecture" in title:
+        return 'hemt'
+    elif "performance" in title:
+        return 'performance'
+    return 'tech'
+
+
+class SceneRenderer:
+    """Renders a scene's slide (diagram plus title) to an RGB array.
+    
+    Renderers are render contexts: an instance keeps its drawing surface and the
+    pre-rendered diagram layers between scenes, so use one per process (get_renderer).
+    """
+    
+    # Diagram types this backend can draw
+    diagrams: Set[str] = set()
+    
+    def supports(self, diagram: str) -> bool:
+        return diagram in self.diagrams
+    
+    def preload(self):
+        """Import the drawing backend up front (first imports must not race between threads)"""
+    
+    def render(self, scene: Dict, width: int, height: int) -> np.ndarray:
+        """Draw the scene's title (and optional 'caption') over its cached diagram layer"""
+        raise NotImplementedError
+
+
+class MatplotlibRenderer(SceneRenderer):
+    """Full matplotlib rendering; required for real charts like the performance comparison"""
+    
+    diagrams = set(DIAGRAM_TYPES)
+    dpi = 120
+    
+    def __init__(self):
+        self.fig = None
+        self.ax = None
+        # {diagram: (saved canvas region, axes position after tight_layout)}
+        self.layers: Dict[str, Tuple[object, object]] = {}
+    
+    def preload(self):
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot
+    
+    def _figure(self, width: int, height: int):
+        """The reusable Agg figure, recreated only when the frame size changes"""
+        import matplotlib.pyplot as plt
+        
+        self.preload()
+        
+        size = (width / self.dpi, height / self.dpi)
+        if self.fig is None or tuple(self.fig.get_size_inches()) != size:
+            if self.fig is not None:
+                plt.close(self.fig)
+            self.fig, self.ax = plt.subplots(figsize=size, dpi=self.dpi)
+            self.fig.patch.set_facecolor(BACKGROUND)
+            self.layers = {}
+        return self.fig, self.ax
+    
+    def _static_layer(self, diagram: str, width: int, height: int):
+        """Render a diagram once and keep the canvas pixels for blitting"""
+        fig, ax = self._figure(width, height)
+        if diagram not in self.layers:
+            ax.clear()
+            ax.set_facecolor(BACKGROUND)
+            
+            draw = {
+                'crystal': self._create_crystal_structure,
+                'applications': self._create_applications_diagram,
+                'hemt': self._create_hemt_structure,
+                'performance': self._create_performance_chart,
+                'tech': self._create_tech_background,
+            }[diagram]
+            draw(ax)
+            
+            fig.tight_layout()
+            fig.canvas.draw()
+            self.layers[diagram] = (fig.canvas.copy_from_bbox(fig.bbox), ax.get_position())
+        return self.layers[diagram]
+    
+    def render(self, scene: Dict, width: int, height: int) -> np.ndarray:
+        background, position = self._static_layer(diagram_type(scene), width, height)
+        fig, ax = self.fig, self.ax
+        
+        # Blit the cached diagram, then draw only the per-scene text on top
+        ax.set_position(position)
+        fig.canvas.restore_region(background)
+        
+        texts = [ax.text(0.5, 0.95, scene['title'], transform=ax.transAxes, 
+                         fontsize=32, color='white', ha='center', va='top',
+                         fontweight='bold', bbox=dict(boxstyle="round,pad=0.5", 
+                         facecolor='#1a1a1a', edgecolor='#4a90e2', linewidth=2))]
+        if scene.get('caption'):
+            texts.append(ax.text(0.5, 0.05, scene['caption'], transform=ax.transAxes, 
+                                 fontsize=12, color='white', ha='center', va='bottom',
+                                 alpha=0.7, style='italic'))
+        for text in texts:
+            ax.draw_artist(text)
+            text.remove()
+        
+        # Drop the alpha channel while copying out of the renderer's buffer
+        frame = np.array(fig.canvas.buffer_rgba())[..., :3]
+        return np.ascontiguousarray(frame)
+    
+    def _create_crystal_structure(self, ax):
+        """Create a GaN crystal structure visualization"""
+        import matplotlib.pyplot as plt
+        
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 10)
+        ax.axis('off')
+        
+        # Draw hexagonal lattice
+        positions = [(2, 5), (3, 6), (4, 5), (5, 6), (6, 5), (3, 4), (5, 4)]
+        for i, (x, y) in enumerate(positions):
+            color = '#4a90e2' if i % 2 == 0 else '#e24a90'
+            circle = plt.Circle((x, y), 0.4, color=color, alpha=0.8)
+            ax.add_patch(circle)
+            
+            # Add connections
+            for j, (x2, y2) in enumerate(positions[i+1:], i+1):
+                dist = np.sqrt((x2-x)**2 + (y2-y)**2)
+                if dist < 2:
+                    ax.plot([x, x2], [y, y2], 'w-', alpha=0.5, linewidth=2)
+        
+        # Add labels
+        ax.text(2, 5.5, 'Ga', color='white', ha='center', fontsize=14, fontweight='bold')
+        ax.text(3, 6.5, 'N', color='white', ha='center', fontsize=14, fontweight='bold')
+        
+        # Add description
+        ax.text(5, 2, 'GaN Crystal Structure\nWide Bandgap Semiconductor', 
+                ha='center', color='white', fontsize=18, alpha=0.8)
+    
+    def _create_applications_diagram(self, ax):
+        """Create applications visualization"""
+        import matplotlib.patches as patches
+        
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 10)
+        ax.axis('off')
+        
+        # Application boxes
+        apps = [
+            (2, 7, "5G\nCommunications", '#4a90e2'),
+            (5, 7, "Electric\nVehicles", '#e24a90'),
+            (8, 7, "Power\nElectronics", '#90e24a'),
+            (2, 4, "RF\nAmplifiers", '#e2904a'),
+            (5, 4, "Solar\nInverters", '#904ae2'),
+            (8, 4, "Radar\nSystems", '#4ae290')
+        ]
+        
+        for x, y, label, color in apps:
+            rect = patches.FancyBboxPatch((x-0.8, y-0.5), 1.6, 1, 
+                                        boxstyle="round,pad=0.1",
+                                        facecolor=color, alpha=0.7,
+                                        edgecolor='white', linewidth=2)
+            ax.add_patch(rect)
+            ax.text(x, y, label, ha='center', va='center', 
+                   color='white', fontsize=12, fontweight='bold')
+        
+        # Central GaN node
+        center = patches.Circle((5, 5.5), 1, facecolor='#1a1a1a', 
+                               edgecolor='#4a90e2', linewidth=3)
+        ax.add_patch(center)
+        ax.text(5, 5.5, 'GaN\nTechnology', ha='center', va='center',
+               color='white', fontsize=14, fontweight='bold')
+    
+    def _create_hemt_structure(self, ax):
+        """Create HEMT layer structure"""
+        import matplotlib.patches as patches
+        
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 10)
+        ax.axis('off')
+        
+        # Layer structure
+        layers = [
+            (2, "Substrate", '#333333'),
+            (3, "Buffer Layer", '#555555'),
+            (4, "GaN Channel", '#4a90e2'),
+            (5, "AlGaN Barrier", '#e24a90'),
+            (6, "Gate", '#ffd700'),
+            (7, "Source/Drain", '#90e24a')
+        ]
+        
+        for y, label, color in layers:
+            rect = patches.Rectangle((2, y-0.4), 6, 0.8, 
+                                   facecolor=color, alpha=0.8,
+                                   edgecolor='white', linewidth=1)
+            ax.add_patch(rect)
+            ax.text(1.5, y, label, ha='right', va='center',
+                   color='white', fontsize=12)
+        
+        # Add 2DEG indication
+        ax.plot([2, 8], [4.5, 4.5], 'y--', linewidth=2, alpha=0.8)
+        ax.text(5, 4.8, '2DEG', ha='center', color='yellow', fontsize=10)
+    
+    def _create_performance_chart(self, ax):
+        """Create performance comparison chart"""
+        materials = ['Si', 'GaAs', 'SiC', 'GaN']
+        metrics = {
+            'Breakdown Field': [0.3, 0.4, 3.0, 3.3],
+            'Electron Mobility': [1.4, 8.5, 0.9, 2.0],
+            'Thermal Conductivity': [1.5, 0.5, 4.9, 2.3]
+        }
+        
+        x = np.arange(len(materials))
+        width = 0.25
+        
+        colors = ['#4a90e2', '#e24a90', '#90e24a']
+        
+        for i, (metric, values) in enumerate(metrics.items()):
+            normalized = [v/max(values) for v in values]
+            ax.bar(x + i*width, normalized, width, label=metric, 
+                  color=colors[i], alpha=0.8)
+        
+        ax.set_xlabel('Material', fontsize=14, color='white')
+        ax.set_ylabel('Normalized Performance', fontsize=14, color='white')
+        ax.set_xticks(x + width)
+        ax.set_xticklabels(materials, color='white')
+        ax.tick_params(colors='white')
+        ax.legend(loc='upper left', facecolor='#1a1a1a', edgecolor='white')
+        ax.grid(True, alpha=0.3)
+        
+        # Highlight GaN
+        ax.axvspan(2.75, 3.75, alpha=0.2, color='yellow')
+    
+    def _create_tech_background(self, ax):
+        """Create a generic tech background"""
+        import matplotlib.pyplot as plt
+        
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 10)
+        ax.axis('off')
+        
+        # Circuit pattern. A local RNG (same stream as np.random.seed(42))
+        # keeps the pattern identical whichever process renders the scene.
+        rng = np.random.RandomState(42)
+        for _ in range(20):
+            x = rng.uniform(0, 10)
+            y = rng.uniform(0, 10)
+            ax.plot([x, x + rng.uniform(-1, 1)], 
+                   [y, y + rng.uniform(-1, 1)], 
+                   'b-', alpha=0.3, linewidth=1)
+            
+        # Add some nodes
+        for _ in range(10):
+            x = rng.uniform(1, 9)
+            y = rng.uniform(1, 9)
+            circle = plt.Circle((x, y), 0.1, color='#4a90e2', alpha=0.6)
+            ax.add_patch(circle)
+
+
+def _font_path(bold: bool, italic: bool):
+    """Find DejaVu Sans (matplotlib's default font) without importing matplotlib"""
+    name = 'DejaVuSans' + {(False, False): '', (True, False): '-Bold',
+                           (False, True): '-Oblique', (True, True): '-BoldOblique'}[bold, italic] + '.ttf'
+    try:
+        ImageFont.truetype(name, 10)
+        return name
+    except OSError:
+        pass
+    
+    spec = importlib.util.find_spec('matplotlib')
+    if spec is not None and spec.submodule_search_locations:
+        path = os.path.join(spec.submodule_search_locations[0], 'mpl-data', 'fonts', 'ttf', name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+_FONTS: Dict[Tuple[int, bool, bool], ImageFont.ImageFont] = {}
+
+
+def _font(size_px: int, bold: bool = False, italic: bool = False):
+    key = (size_px, bold, italic)
+    if key not in _FONTS:
+        path = _font_path(bold, italic)
+        _FONTS[key] = ImageFont.truetype(path, size_px) if path else ImageFont.load_default(size_px)
+    return _FONTS[key]
+
+
+def _rgba(color: str, alpha: float = 1.0) -> Tuple[int, int, int, int]:
+    color = color.lstrip('#')
+    return (int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16), round(alpha * 255))
+
+
+class _Canvas:
+    """Pillow drawing surface using the diagrams' 0-10 data coordinates"""
+    
+    def __init__(self, width: int, height: int, dpi: int, image: Optional[Image.Image] = None):
+        self.image = image if image is not None else Image.new('RGB', (width, height), BACKGROUND)
+        # RGBA drawing mode blends translucent fills onto the RGB image
+        self.draw = ImageDraw.Draw(self.image, 'RGBA')
+        self.dpi = dpi
+        
+        # Match the small border tight_layout leaves around the axes
+        pad = round(0.02 * min(width, height))
+        self.left, self.top = pad, pad
+        self.width, self.height = width - 2 * pad, height - 2 * pad
+    
+    def px(self, points: float) -> int:
+        """Convert a size in points to pixels"""
+        return max(1, round(points * self.dpi / 72))
+    
+    def xy(self, x: float, y: float) -> Tuple[float, float]:
+        return (self.left + x / 10 * self.width, self.top + (1 - y / 10) * self.height)
+    
+    def ellipse(self, x: float, y: float, r: float, fill, outline=None, width: float = 0):
+        x0, y0 = self.xy(x - r, y + r)
+        x1, y1 = self.xy(x + r, y - r)
+        self.draw.ellipse([x0, y0, x1, y1], fill=fill, outline=outline,
+                          width=self.px(width) if outline else 0)
+    
+    def rect(self, x: float, y: float, w: float, h: float, fill, outline=None,
+             width: float = 0, radius: float = 0):
+        x0, y0 = self.xy(x, y + h)
+        x1, y1 = self.xy(x + w, y)
+        self.draw.rounded_rectangle([x0, y0, x1, y1], radius=radius / 10 * self.width,
+                                    fill=fill, outline=outline,
+                                    width=self.px(width) if outline else 0)
+    
+    def line(self, x1: float, y1: float, x2: float, y2: float, fill, width: float,
+             dashed: bool = False):
+        start, end = np.array(self.xy(x1, y1)), np.array(self.xy(x2, y2))
+        if not dashed:
+            self.draw.line([tuple(start), tuple(end)], fill=fill, width=self.px(width))
+            return
+        
+        # matplotlib's '--' pattern: 3.7 on, 1.6 off, scaled by the line width
+        on, off = self.px(3.7 * width), self.px(1.6 * width)
+        length = np.hypot(*(end - start))
+        direction = (end - start) / length
+        pos = 0.0
+        while pos < length:
+            seg_end = min(pos + on, length)
+            self.draw.line([tuple(start + direction * pos), tuple(start + direction * seg_end)],
+                           fill=fill, width=self.px(width))
+            pos = seg_end + off
+    
+    def text(self, x: float, y: float, text: str, size: float, fill, bold: bool = False,
+             anchor: str = 'mm', align: str = 'center'):
+        self.draw.multiline_text(self.xy(x, y), text, font=_font(self.px(size), bold),
+                                 fill=fill, anchor=anchor, align=align)
+    
+    def title(self, text: str):
+        """Rounded title box at the top centre, like the matplotlib version"""
+        font = _font(self.px(32), True)
+        x = self.left + self.width / 2
+        y = self.top + 0.05 * self.height
+        left, top, right, bottom = self.draw.textbbox((x, y), text, font=font, anchor='mt')
+        pad = self.px(32) * 0.5
+        self.draw.rounded_rectangle([left - pad, top - pad, right + pad, bottom + pad],
+                                    radius=pad, fill=_rgba('#1a1a1a'),
+                                    outline=_rgba('#4a90e2'), width=self.px(2))
+        self.draw.text((x, y), text, font=font, fill=_rgba('#ffffff'), anchor='mt')
+    
+    def caption(self, text: str):
+        """Italic caption line at the bottom centre"""
+        x = self.left + self.width / 2
+        y = self.top + 0.95 * self.height
+        self.draw.text((x, y), text, font=_font(self.px(12), italic=True),
+                       fill=_rgba('#ffffff', 0.7), anchor='md')
+    
+    def to_array(self) -> np.ndarray:
+        return np.array(self.image)
+
+
+class PillowRenderer(SceneRenderer):
+    """Fast raster backend for the built-in diagrams; skips matplotlib figure setup and layout"""
+    
+    diagrams = {'crystal', 'applications', 'hemt', 'tech'}
+    dpi = 120
+    
+    def __init__(self):
+        # {(diagram, width, height): diagram drawn without any per-scene text}
+        self.layers: Dict[Tuple[str, int, int], Image.Image] = {}
+    
+    def _static_layer(self, diagram: str, width: int, height: int) -> Image.Image:
+        key = (diagram, width, height)
+        if key not in self.layers:
+            canvas = _Canvas(width, height, self.dpi)
+            draw = {
+                'crystal': self._draw_crystal_structure,
+                'applications': self._draw_applications_diagram,
+                'hemt': self._draw_hemt_structure,
+                'tech': self._draw_tech_background,
+            }[diagram]
+            draw(canvas)
+            self.layers[key] = canvas.image
+        return self.layers[key]
+    
+    def render(self, scene: Dict, width: int, height: int) -> np.ndarray:
+        layer = self._static_layer(diagram_type(scene), width, height)
+        canvas = _Canvas(width, height, self.dpi, image=layer.copy())
+        canvas.title(scene['title'])
+        if scene.get('caption'):
+            canvas.caption(scene['caption'])
+        return canvas.to_array()
+    
+    # Shapes are drawn before lines and lines before text, matching matplotlib's z-order
+    
+    def _draw_crystal_structure(self, canvas: _Canvas):
+        positions = [(2, 5), (3, 6), (4, 5), (5, 6), (6, 5), (3, 4), (5, 4)]
+        for i, (x, y) in enumerate(positions):
+            color = '#4a90e2' if i % 2 == 0 else '#e24a90'
+            canvas.ellipse(x, y, 0.4, fill=_rgba(color, 0.8))
+        
+        for i, (x, y) in enumerate(positions):
+            for x2, y2 in positions[i + 1:]:
+                if np.hypot(x2 - x, y2 - y) < 2:
+                    canvas.line(x, y, x2, y2, fill=_rgba('#ffffff', 0.5), width=2)
+        
+        white = _rgba('#ffffff')
+        canvas.text(2, 5.5, 'Ga', 14, white, bold=True, anchor='md')
+        canvas.text(3, 6.5, 'N', 14, white, bold=True, anchor='md')
+        canvas.text(5, 2, 'GaN Crystal Structure\nWide Bandgap Semiconductor', 18,
+                    _rgba('#ffffff', 0.8), anchor='md')
+    
+    def _draw_applications_diagram(self, canvas: _Canvas):
+        apps = [
+            (2, 7, "5G\nCommunications", '#4a90e2'),
+            (5, 7, "Electric\nVehicles", '#e24a90'),
+            (8, 7, "Power\nElectronics", '#90e24a'),
+            (2, 4, "RF\nAmplifiers", '#e2904a'),
+            (5, 4, "Solar\nInverters", '#904ae2'),
+            (8, 4, "Radar\nSystems", '#4ae290')
+        ]
+        
+        # Rounded boxes include the FancyBboxPatch pad of 0.1
+        for x, y, _, color in apps:
+            canvas.rect(x - 0.9, y - 0.6, 1.8, 1.2, fill=_rgba(color, 0.7),
+                        outline=_rgba('#ffffff', 0.7), width=2, radius=0.1)
+        canvas.ellipse(5, 5.5, 1, fill=_rgba('#1a1a1a'), outline=_rgba('#4a90e2'), width=3)
+        
+        white = _rgba('#ffffff')
+        for x, y, label, _ in apps:
+            canvas.text(x, y, label, 12, white, bold=True)
+        canvas.text(5, 5.5, 'GaN\nTechnology', 14, white, bold=True)
+    
+    def _draw_hemt_structure(self, canvas: _Canvas):
+        layers = [
+            (2, "Substrate", '#333333'),
+            (3, "Buffer Layer", '#555555'),
+            (4, "GaN Channel", '#4a90e2'),
+            (5, "AlGaN Barrier", '#e24a90'),
+            (6, "Gate", '#ffd700'),
+            (7, "Source/Drain", '#90e24a')
+        ]
+        
+        for y, _, color in layers:
+            canvas.rect(2, y - 0.4, 6, 0.8, fill=_rgba(color, 0.8),
+                        outline=_rgba('#ffffff', 0.8), width=1)
+        
+        # 2DEG indication
+        canvas.line(2, 4.5, 8, 4.5, fill=_rgba('#bfbf00', 0.8), width=2, dashed=True)
+        
+        white = _rgba('#ffffff')
+        for y, label, _ in layers:
+            canvas.text(1.5, y, label, 12, white, anchor='rm', align='right')
+        canvas.text(5, 4.8, '2DEG', 10, _rgba('#ffff00'), anchor='md')
+    
+    def _draw_tech_background(self, canvas: _Canvas):
+        # Same RNG stream as the matplotlib version, so the pattern matches
+        rng = np.random.RandomState(42)
+        lines = []
+        for _ in range(20):
+            x = rng.uniform(0, 10)
+            y = rng.uniform(0, 10)
+            lines.append((x, y, x + rng.uniform(-1, 1), y + rng.uniform(-1, 1)))
+        nodes = [(rng.uniform(1, 9), rng.uniform(1, 9)) for _ in range(10)]
+        
+        for x, y in nodes:
+            canvas.ellipse(x, y, 0.1, fill=_rgba('#4a90e2', 0.6))
+        for x1, y1, x2, y2 in lines:
+            canvas.line(x1, y1, x2, y2, fill=_rgba('#0000ff', 0.3), width=1)
+
+
+RENDERERS: Dict[str, Type[SceneRenderer]] = {
+    'matplotlib': MatplotlibRenderer,
+    'pillow': PillowRenderer,
+}
+
+_INSTANCES: Dict[str, SceneRenderer] = {}
+
+# Shared instances reuse one figure and layer cache, so threads of a process
+# (e.g. in-process distributed workers) take turns rendering
+RENDER_LOCK = threading.Lock()
+
+
+def register_renderer(name: str, renderer_class: Type[SceneRenderer]):
+    """Make a renderer backend selectable by name"""
+    RENDERERS[name] = renderer_class
+    _INSTANCES.pop(name, None)
+
+
+def get_renderer(name: str) -> SceneRenderer:
+    """Shared renderer instance for a backend name"""
+    if name not in _INSTANCES:
+        _INSTANCES[name] = RENDERERS[name]()
+    return _INSTANCES[name]
+
+
+def renderer_for(scene: Dict, default: str = 'auto') -> SceneRenderer:
+    """Choose the backend for a scene: its own 'renderer' entry, else the default.
+    
+    'auto' uses the Pillow backend for diagrams it supports and matplotlib otherwise.
+    """
+    name = scene.get('renderer', default)
+    if name == 'auto':
+        pillow = get_renderer('pillow')
+        return pillow if pillow.supports(diagram_type(scene)) else get_renderer('matplotlib')
+    return get_renderer(name)
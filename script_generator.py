@@ -1,18 +1,27 @@
 from pdf_extractor import PDFExtractor
-from typing import List, Dict
+from tracing import span
+from itertools import islice
+from typing import List, Dict, Optional, Tuple
 import re
 import json
 
 class ScriptGenerator:
-    def __init__(self, pdf_path: str):
-        self.extractor = PDFExtractor(pdf_path)
+    def __init__(self, pdf_path: str, extractor: Optional[PDFExtractor] = None):
+        # Reuse an extractor that already holds the document when one is given
+        self.extractor = extractor or PDFExtractor(pdf_path)
         self.scenes = []
         
-    def generate_script(self) -> List[Dict]:
+    def generate_script(self, max_sections: int = 10,
+                        page_range: Optional[Tuple[int, int]] = None,
+                        max_pages: Optional[int] = None) -> List[Dict]:
         """Generate a video script with scenes based on PDF content"""
-        # Extract and parse PDF content
-        self.extractor.extract_text()
-        sections = self.extractor.parse_sections()
+        if self.extractor.sections and page_range is None and max_pages is None:
+            # Sections were already parsed by the caller
+            sections = islice(self.extractor.sections, max_sections)
+        else:
+            # Stream sections from the PDF and stop reading once we have enough
+            pages = self.extractor.iter_pages(page_range=page_range, max_pages=max_pages)
+            sections = islice(self.extractor.iter_sections(pages), max_sections)
         
         # Create introduction scene
         self.scenes.append({
@@ -26,12 +35,13 @@ class ScriptGenerator:
         
         # Process main content sections
         scene_id = 2
-        for section in sections[:10]:  # Limit to top 10 sections
+        for section in sections:
             if len(section["content"]) < 100:  # Skip very short sections
                 continue
                 
             # Clean and summarize content
-            summary = self._summarize_content(section["content"])
+            with span("summarize"):
+                summary = self._summarize_content(section["content"])
             if not summary:
                 continue
                 
@@ -120,17 +130,21 @@ class ScriptGenerator:
             cleaned.append(word)
         return ' '.join(cleaned)
     
-    def save_script(self, output_path: str = "video_script.json"):
-        """Save the generated script to a JSON file"""
+    def build_script_data(self) -> Dict:
+        """Wrap the generated scenes in the video script structure"""
         if not self.scenes:
             self.generate_script()
             
-        script_data = {
+        return {
             "title": "GaN Technology: A Comprehensive Overview",
             "total_duration": sum(scene["duration"] for scene in self.scenes),
             "scene_count": len(self.scenes),
             "scenes": self.scenes
         }
+    
+    def save_script(self, output_path: str = "video_script.json"):
+        """Save the generated script to a JSON file"""
+        script_data = self.build_script_data()
         
         with open(output_path, 'w') as f:
             json.dump(script_data, f, indent=2)
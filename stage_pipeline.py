@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class Stage:
+    """One step of a streaming pipeline, run by a pool of threads"""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+
+
+class StageStats:
+    """Where a stage's threads spent their time"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        # Seconds summed over all of the stage's threads
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.wall = 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's thread time spent doing work"""
+        return self.busy / (self.workers * self.wall) if self.wall else 0.0
+
+    def summary(self) -> str:
+        # starved = waiting for input from upstream, blocked = waiting for room downstream
+        return (f"{self.name:12} {self.workers:3d} workers {self.items:5d} items  "
+                f"busy {self.busy:7.2f}s  starved {self.starved:7.2f}s  "
+                f"blocked {self.blocked:7.2f}s  utilization {self.utilization:6.1%}")
+
+
+def run_stages(items: Iterable[Any], stages: List[Stage], queue_size: int = 2,
+               on_result: Optional[Callable[[int, Any], None]] = None
+               ) -> Tuple[List[Any], Dict[str, StageStats]]:
+    """Stream items through the stages concurrently and return results in input order.
+
+    Stages are joined by queues holding at most queue_size items, so a fast stage
+    waits for a slow one instead of piling up results (back-pressure). The first
+    exception raised by any stage is re-raised once the pipeline has drained.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    stats = {stage.name: StageStats(stage.name, stage.workers) for stage in stages}
+    errors: List[BaseException] = []
+    lock = threading.Lock()
+    running = [stage.workers for stage in stages]
+
+    def feed():
+        for index, item in enumerate(items):
+            queues[0].put((index, item))
+        for _ in range(stages[0].workers):
+            queues[0].put(_DONE)
+
+    def work(position: int):
+        stage = stages[position]
+        stage_stats = stats[stage.name]
+        inbox, outbox = queues[position], queues[position + 1]
+        started = time.perf_counter()
+
+        while True:
+            wait_start = time.perf_counter()
+            entry = inbox.get()
+            busy_start = time.perf_counter()
+            if entry is _DONE:
+                break
+
+            index, item = entry
+            result = None
+            if not errors:
+                try:
+                    result = stage.func(item)
+                except BaseException as e:
+                    with lock:
+                        errors.append(e)
+            busy_end = time.perf_counter()
+
+            outbox.put((index, result))
+            with lock:
+                stage_stats.items += 1
+                stage_stats.starved += busy_start - wait_start
+                stage_stats.busy += busy_end - busy_start
+                stage_stats.blocked += time.perf_counter() - busy_end
+
+        with lock:
+            stage_stats.wall = max(stage_stats.wall, time.perf_counter() - started)
+            running[position] -= 1
+            last = running[position] == 0
+        if last:
+            # The next stage (or the collector) stops once every worker here has finished
+            downstream = stages[position + 1].workers if position + 1 < len(stages) else 1
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    threads += [threading.Thread(target=work, args=(position,), daemon=True,
+                                 name=f"{stage.name}-{n}")
+                for position, stage in enumerate(stages) for n in range(stage.workers)]
+    for thread in threads:
+        thread.start()
+
+    results = {}
+    while True:
+        entry = queues[-1].get()
+        if entry is _DONE:
+            break
+        index, result = entry
+        results[index] = result
+        if on_result is not None and not errors:
+            on_result(index, result)
+
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return [results[index] for index in range(len(results))], stats
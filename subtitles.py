@@ -0,0 +1,97 @@
+import re
+import textwrap
+from typing import List, Tuple
+
+# (start seconds, end seconds, text)
+Cue = Tuple[float, float, str]
+
+# Two lines of about 42 characters fit on screen at the usual caption size
+LINE_CHARS = 42
+MAX_CUE_CHARS = 2 * LINE_CHARS
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_cues(text: str, max_chars: int = MAX_CUE_CHARS) -> List[str]:
+    """Split narration into sentences, breaking long ones into even word chunks"""
+    cues = []
+    for sentence in _SENTENCE_END.split(" ".join(text.split())):
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars or " " not in sentence:
+            cues.append(sentence)
+            continue
+        # Cut at the word boundaries nearest to even shares, so chunks come out balanced
+        # instead of full cues followed by a short leftover
+        words = sentence.split()
+        chunks = -(-len(sentence) // max_chars)
+        ends = []
+        position = 0
+        for word in words:
+            position += len(word) + 1
+            ends.append(position)
+        cuts = sorted({min(range(1, len(words)), key=lambda i: abs(ends[i - 1] - share))
+                       for share in (len(sentence) * k / chunks for k in range(1, chunks))})
+        for start, stop in zip([0] + cuts, cuts + [len(words)]):
+            cues.append(" ".join(words[start:stop]))
+    return cues
+
+
+def time_cues(text: str, start: float, speech_duration: float,
+              max_chars: int = MAX_CUE_CHARS) -> List[Cue]:
+    """Spread a scene's cues over its narration, in proportion to their length"""
+    parts = split_cues(text, max_chars)
+    if not parts:
+        return []
+    total = sum(len(part) for part in parts)
+    cues = []
+    position = start
+    for part in parts:
+        end = position + speech_duration * len(part) / total
+        cues.append((position, end, part))
+        position = end
+    return cues
+
+
+def build_cues(scenes: List[Tuple[float, float, str]], max_chars: int = MAX_CUE_CHARS) -> List[Cue]:
+    """Cues for a whole video from (scene start, narration duration, text) triples"""
+    cues = []
+    for start, speech_duration, text in scenes:
+        cues += time_cues(text, start, speech_duration, max_chars)
+    return cues
+
+
+def format_timestamp(seconds: float, separator: str = ".") -> str:
+    """HH:MM:SS.mmm (WebVTT) or HH:MM:SS,mmm (SRT)"""
+    millis = round(seconds * 1000)
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def _lines(text: str) -> str:
+    return "\n".join(textwrap.wrap(text, LINE_CHARS)) or text
+
+
+def to_webvtt(cues: List[Cue]) -> str:
+    blocks = ["WEBVTT"]
+    for start, end, text in cues:
+        blocks.append(f"{format_timestamp(start)} --> {format_timestamp(end)}\n{_lines(text)}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def to_srt(cues: List[Cue]) -> str:
+    blocks = []
+    for number, (start, end, text) in enumerate(cues, 1):
+        blocks.append(f"{number}\n{format_timestamp(start, ',')} --> "
+                      f"{format_timestamp(end, ',')}\n{_lines(text)}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def write_subtitles(cues: List[Cue], path: str) -> str:
+    """Write cues as SRT or WebVTT, chosen by the file extension"""
+    content = to_srt(cues) if path.lower().endswith(".srt") else to_webvtt(cues)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
@@ -0,0 +1,86 @@
+import time
+
+from distributed import Coordinator, MemoryQueue
+
+PAYLOAD = {"run": "r1", "scene_id": 1, "clip_key": "k", "audio_key": "a",
+           "audio_suffix": ".wav", "duration": 2.0}
+
+
+def test_expired_lease_is_redispatched_and_completed_once():
+    queue = MemoryQueue()
+    queue.put("scene-00001", PAYLOAD)
+    assert queue.claim("a", lease_seconds=-1) == ("scene-00001", PAYLOAD)
+
+    assert queue.expire_leases() == ["scene-00001"]
+    assert queue.pending() == 1
+    # The stalled worker has lost its lease
+    assert not queue.renew("scene-00001", "a", 60)
+
+    assert queue.claim("b", lease_seconds=60) == ("scene-00001", PAYLOAD)
+    assert queue.complete("scene-00001", "b", {"worker": "b", "seconds": 1.0})
+    # The stalled worker finishing late records nothing more
+    assert not queue.complete("scene-00001", "a", {"worker": "a", "seconds": 9.0})
+    queue.fail("scene-00001", "a", "late failure")
+
+    results, failures = queue.collect()
+    assert results == [("scene-00001", PAYLOAD, {"worker": "b", "seconds": 1.0})]
+    assert failures == []
+    assert queue.pending() == 0 and queue.running() == {}
+    assert queue.collect() == ([], [])
+
+
+def test_failing_job_is_retried_until_attempts_run_out():
+    queue = MemoryQueue(max_attempts=3)
+    queue.put("scene-00001", PAYLOAD)
+
+    for attempt in range(3):
+        assert queue.claim("w", lease_seconds=60) == ("scene-00001", PAYLOAD)
+        queue.fail("scene-00001", "w", f"RuntimeError: attempt {attempt}")
+    assert queue.claim("w", lease_seconds=60) is None
+
+    results, failures = queue.collect()
+    assert results == []
+    assert failures == [("scene-00001", PAYLOAD, "RuntimeError: attempt 2")]
+    assert queue.pending() == 0 and queue.running() == {}
+    assert queue.collect() == ([], [])
+
+
+def test_expired_leases_count_as_attempts():
+    queue = MemoryQueue(max_attempts=2)
+    queue.put("scene-00001", PAYLOAD)
+    for _ in range(2):
+        queue.claim("w", lease_seconds=-1)
+        queue.expire_leases()
+
+    results, failures = queue.collect()
+    assert results == []
+    assert failures == [("scene-00001", PAYLOAD, "lease of w expired")]
+
+
+def test_straggler_backup_completion_is_recorded_once():
+    queue = MemoryQueue()
+    coordinator = Coordinator(None, queue, store=None, straggler_factor=2.0)
+    queue.put("scene-00001", PAYLOAD)
+    queue.claim("slow", lease_seconds=60)
+    jobs = {1: {"scene-00001"}}
+    outstanding = {1: {"scene_id": 1}}
+
+    # Other scenes took 10 ms, this one has been running for longer than 2x that
+    coordinator.render_seconds = [0.01]
+    time.sleep(0.05)
+    coordinator._dispatch_backups(jobs, outstanding)
+    assert jobs[1] == {"scene-00001", "scene-00001-backup"}
+    # Only one backup per scene
+    coordinator._dispatch_backups(jobs, outstanding)
+    assert queue.pending() == 1
+
+    assert queue.claim("fast", lease_seconds=60) == ("scene-00001-backup", PAYLOAD)
+    assert queue.complete("scene-00001-backup", "fast", {"worker": "fast", "seconds": 0.01})
+    # The coordinator withdraws the original once the backup's clip arrives
+    queue.cancel("scene-00001")
+    assert not queue.complete("scene-00001", "slow", {"worker": "slow", "seconds": 5.0})
+
+    results, failures = queue.collect()
+    assert results == [("scene-00001-backup", PAYLOAD, {"worker": "fast", "seconds": 0.01})]
+    assert failures == []
+    assert queue.pending() == 0 and queue.running() == {}
@@ -0,0 +1,69 @@
+"""
+Import-time budget tests
+Fail when importing a pipeline module gets slow or pulls in a heavy backend
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Set, Tuple
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time allowed per module, in milliseconds
+IMPORT_BUDGETS_MS = {
+    "pdf_extractor": 50,
+    "script_generator": 50,
+    "video_generator": 50,
+    "pipeline": 50,
+}
+
+# Backends that must only load when the stage that needs them runs
+HEAVY_MODULES = {"PyPDF2", "numpy", "PIL", "matplotlib", "moviepy", "cv2", "gtts", "requests", "tqdm"}
+
+
+def _importtime(statement: str) -> Dict[str, int]:
+    """Run a statement under -X importtime and return {indented module name: cumulative us}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+        cwd=REPO_ROOT)
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # with nested imports indented below the package that triggered them
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            timings[name.rstrip()] = int(cumulative)
+    return timings
+
+
+def measure_import(module: str, runs: int = 3) -> Tuple[float, Set[str]]:
+    """Return the best cumulative import time (ms) of a module and the packages it loaded"""
+    # Whatever the interpreter loads at startup (site, .pth hooks) is not the module's cost
+    baseline = {name.strip().split(".")[0] for name in _importtime("pass")}
+
+    best_us = None
+    loaded = set()
+    for _ in range(runs):
+        timings = _importtime(f"import {module}")
+        loaded |= {name.strip().split(".")[0] for name in timings} - baseline
+        cumulative_us = timings.get(f" {module}", 0)
+        best_us = cumulative_us if best_us is None else min(best_us, cumulative_us)
+
+    return best_us / 1000.0, loaded
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS_MS))
+def test_import_time_budget(module):
+    # Each measurement runs in a fresh interpreter, so nothing is imported already
+    elapsed_ms, loaded = measure_import(module)
+    heavy = sorted(loaded & HEAVY_MODULES)
+    assert not heavy, f"importing {module} loads {', '.join(heavy)}"
+    assert elapsed_ms <= IMPORT_BUDGETS_MS[module], (
+        f"importing {module} took {elapsed_ms:.1f} ms (budget {IMPORT_BUDGETS_MS[module]} ms)")
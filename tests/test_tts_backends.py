@@ -0,0 +1,95 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import tts_backends
+from tts_backends import GTTSBackend
+
+pytest.importorskip("gtts")
+pytest.importorskip("requests")
+
+AUDIO = b"ID3\x03\x00fake mp3 frames" * 8
+
+
+class StubTranslate(BaseHTTPRequestHandler):
+    """Answers with the queued status codes, then with a gTTS-style audio response"""
+
+    statuses = []
+    paths = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).paths.append(self.path)
+        status = type(self).statuses.pop(0) if type(self).statuses else 200
+        body = b""
+        if status == 200:
+            payload = json.dumps([base64.b64encode(AUDIO).decode("ascii")])
+            rpc = [["wrb.fr", "jQ1olc", payload, None, None, None, "generic"]]
+            body = (")]}'\n\n" + json.dumps(rpc, separators=(",", ":"))).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = HTTPServer(("127.0.0.1", 0), StubTranslate)
+    StubTranslate.statuses = []
+    StubTranslate.paths = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(tts_backends.time, "sleep", delays.append)
+    return delays
+
+
+def test_gtts_retries_rate_limits_and_server_errors(stub_server, sleeps, tmp_path):
+    StubTranslate.statuses = [429, 503]
+    backend = GTTSBackend(endpoint=stub_server, retries=3, backoff=0.5)
+    output_path = tmp_path / "narration.mp3"
+
+    backend.synthesize("Gallium nitride transistors switch fast.", str(output_path))
+
+    assert len(StubTranslate.paths) == 3
+    assert StubTranslate.paths[0] == "/_/TranslateWebserverUi/data/batchexecute"
+    assert sleeps == [0.5, 1.0]
+    assert output_path.read_bytes() == AUDIO
+
+
+def test_gtts_gives_up_after_its_retries(stub_server, sleeps, tmp_path):
+    from gtts.tts import gTTSError
+
+    StubTranslate.statuses = [500, 502, 503]
+    backend = GTTSBackend(endpoint=stub_server, retries=2, backoff=1.0)
+
+    with pytest.raises(gTTSError):
+        backend.synthesize("Hello", str(tmp_path / "narration.mp3"))
+    assert len(StubTranslate.paths) == 3
+    assert sleeps == [1.0, 2.0]
+    assert not (tmp_path / "narration.mp3").exists()
+
+
+def test_gtts_does_not_retry_client_errors(stub_server, sleeps, tmp_path):
+    from gtts.tts import gTTSError
+
+    StubTranslate.statuses = [403]
+    backend = GTTSBackend(endpoint=stub_server, retries=3)
+
+    with pytest.raises(gTTSError):
+        backend.synthesize("Hello", str(tmp_path / "narration.mp3"))
+    assert len(StubTranslate.paths) == 1
+    assert sleeps == []
@@ -0,0 +1,166 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak RSS is not reported
+    resource = None
+
+# Returned by span() while tracing is off, so instrumented code pays one global lookup
+_NO_SPAN = nullcontext()
+
+_tracer: Optional["Tracer"] = None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Tracer:
+    """Collects timed spans as Chrome trace events ("X" complete events)"""
+
+    def __init__(self):
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **args):
+        """Record wall time, this thread's CPU time and the process's peak RSS so far"""
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            args["cpu_ms"] = round((time.thread_time() - cpu_start) * 1000, 3)
+            args["peak_rss_bytes"] = _peak_rss_bytes()
+            event = {"name": name, "cat": category, "ph": "X",
+                     # perf_counter is system-wide monotonic, so events from worker
+                     # processes line up with the parent's
+                     "ts": round(start * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+                     "pid": os.getpid(), "tid": threading.get_ident(), "args": args}
+            with self._lock:
+                self.events.append(event)
+
+    def add_events(self, events: List[Dict]):
+        """Merge events recorded in another process"""
+        with self._lock:
+            self.events.extend(events)
+
+    def chrome_trace(self) -> Dict:
+        """Trace in the Chrome trace event format (chrome://tracing, Perfetto)"""
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+        origin = events[0]["ts"] if events else 0.0
+        trace_events = [dict(event, ts=round(event["ts"] - origin, 1)) for event in events]
+        # Name the process lanes: the first one seen is the main process
+        pids = list(dict.fromkeys(event["pid"] for event in events))
+        trace_events += [{"name": "process_name", "ph": "M", "pid": pid,
+                          "args": {"name": "main" if n == 0 else f"worker {n}"}}
+                         for n, pid in enumerate(pids)]
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """Count, wall seconds, CPU seconds and peak RSS per span name"""
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            stage = totals.setdefault(event["name"], {"count": 0, "seconds": 0.0,
+                                                      "cpu_seconds": 0.0, "peak_rss_bytes": 0})
+            stage["count"] += 1
+            stage["seconds"] += event["dur"] / 1e6
+            stage["cpu_seconds"] += event["args"]["cpu_ms"] / 1000
+            stage["peak_rss_bytes"] = max(stage["peak_rss_bytes"],
+                                          event["args"]["peak_rss_bytes"] or 0)
+        return totals
+
+    def prometheus_text(self, prefix: str = "gan_video") -> str:
+        """Per-stage totals in the Prometheus text exposition format"""
+        totals = self.stage_totals()
+        metrics = [
+            ("stage_calls_total", "counter", "Spans recorded per stage", "count"),
+            ("stage_seconds_total", "counter", "Wall time spent per stage", "seconds"),
+            ("stage_cpu_seconds_total", "counter", "Python CPU time per stage", "cpu_seconds"),
+            ("stage_peak_rss_bytes", "gauge", "Largest process peak RSS seen at the end of a stage",
+             "peak_rss_bytes"),
+        ]
+        lines = []
+        for metric, kind, help_text, field in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for stage, values in sorted(totals.items()):
+                value = values[field]
+                text = f"{value:.6f}" if isinstance(value, float) else str(value)
+                lines.append(f'{prefix}_{metric}{{stage="{stage}"}} {text}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> str:
+        with open(path, "w") as f:
+            f.write(self.prometheus_text())
+        return path
+
+
+def enable_tracing() -> Tracer:
+    """Start recording spans in this process (keeps an already running tracer)"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing() -> Optional[Tracer]:
+    """Stop recording and return the tracer with everything recorded so far"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, category: str = "stage", **args):
+    """Context manager timing a block when tracing is enabled, a no-op otherwise"""
+    if _tracer is None:
+        return _NO_SPAN
+    return _tracer.span(name, category, **args)
+
+
+def run_traced(enabled: bool, func: Callable, *args) -> Tuple[Any, List[Dict]]:
+    """Run func in a worker process and return its result with the spans it recorded.
+
+    Forked workers inherit the parent's tracer and spawned ones have none, so the
+    worker records into a fresh tracer of its own.
+    """
+    global _tracer
+    if not enabled:
+        return func(*args), []
+    _tracer = Tracer()
+    try:
+        return func(*args), _tracer.events
+    finally:
+        _tracer = None
+
+
+def merge_traced(outcome: Tuple[Any, List[Dict]]) -> Any:
+    """Add a worker's spans (from run_traced) to this process's tracer; returns its result"""
+    result, events = outcome
+    if events and _tracer is not None:
+        _tracer.add_events(events)
+    return result
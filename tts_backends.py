@@ -0,0 +1,187 @@
+import base64
+import copy
+import os
+import re
+import shutil
+import subprocess
+import time
+import wave
+from typing import Dict, Optional, Type
+
+# Google Translate RPC used by gTTS, and the base64 audio in its response
+_GTTS_RPC_PATH = "/_/TranslateWebserverUi/data/batchexecute"
+_GTTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+class TTSBackend:
+    """Turns narration text into an audio file"""
+
+    name = "base"
+    # Audio container written by synthesize()
+    extension = ".wav"
+    # Narrations synthesized at once by VideoGenerator's narration stage
+    concurrency = 1
+
+    def synthesize(self, text: str, output_path: str):
+        raise NotImplementedError
+
+    def cache_settings(self) -> Dict:
+        """Everything besides the text that changes the audio, for cache keys"""
+        return {"backend": self.name}
+
+    def for_language(self, language: str) -> "TTSBackend":
+        """The same engine configured to speak another language"""
+        return self
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS via gTTS (needs network access)"""
+
+    name = "gtts"
+    extension = ".mp3"
+
+    def __init__(self, lang: str = "en", slow: bool = False, tld: str = "com",
+                 concurrency: int = 4, retries: int = 3, backoff: float = 1.0,
+                 timeout: float = 30.0, endpoint: Optional[str] = None):
+        self.lang = lang
+        self.slow = slow
+        self.tld = tld
+        # Requests in flight at once; the service rate-limits bursts
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        # Seconds before the first retry, doubled after each failed attempt
+        self.backoff = backoff
+        self.timeout = timeout
+        # Alternative base URL (e.g. a local stub server) instead of translate.google.<tld>
+        self.endpoint = endpoint
+
+    def cache_settings(self) -> Dict:
+        return {"backend": self.name, "lang": self.lang, "slow": self.slow, "tld": self.tld}
+
+    def for_language(self, language: str) -> "GTTSBackend":
+        backend = copy.copy(self)
+        backend.lang = language
+        return backend
+
+    def _url(self) -> str:
+        base = self.endpoint or f"https://translate.google.{self.tld}"
+        return base.rstrip("/") + _GTTS_RPC_PATH
+
+    def _post(self, session, tts, body: str) -> bytes:
+        """Send one request, retrying 429, 5xx and connection errors with exponential backoff"""
+        import requests
+        from gtts.tts import gTTSError
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = session.post(self._url(), data=body, headers=tts.GOOGLE_TTS_HEADERS,
+                                        timeout=self.timeout)
+            except requests.RequestException:
+                response, error = None, gTTSError(tts=tts)
+            else:
+                if response.ok:
+                    audio = _GTTS_AUDIO.search(response.text)
+                    if audio is None:
+                        raise gTTSError(tts=tts, response=response)
+                    return base64.b64decode(audio.group(1))
+                error = gTTSError(tts=tts, response=response)
+            # Client errors (bad language, malformed request) will not go away on retry
+            status = response.status_code if response is not None else None
+            retryable = status is None or status == 429 or status >= 500
+            if not retryable or attempt == self.retries:
+                raise error
+            delay = self.backoff * 2 ** attempt
+            print(f"gTTS request failed ({error}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+    def synthesize(self, text: str, output_path: str):
+        import requests
+        from gtts import gTTS
+
+        # gTTS checks the language and splits long text into request bodies; the
+        # requests go through our own session so the endpoint and retries are ours
+        tts = gTTS(text=text, lang=self.lang, slow=self.slow, tld=self.tld)
+        with requests.Session() as session:
+            parts = [self._post(session, tts, body) for body in tts.get_bodies()]
+        with open(output_path, "wb") as f:
+            for part in parts:
+                f.write(part)
+
+
+class EspeakBackend(TTSBackend):
+    """Offline synthesis with the espeak-ng (or espeak) command line tool"""
+
+    name = "espeak"
+    extension = ".wav"
+
+    def __init__(self, voice: str = "en", speed: int = 160, pitch: int = 50,
+                 concurrency: Optional[int] = None, executable: Optional[str] = None):
+        self.voice = voice
+        # Words per minute
+        self.speed = speed
+        self.pitch = pitch
+        # Local processes, so one per core by default
+        self.concurrency = max(1, concurrency or os.cpu_count() or 1)
+        self.executable = executable or shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def cache_settings(self) -> Dict:
+        return {"backend": self.name, "voice": self.voice, "speed": self.speed, "pitch": self.pitch}
+
+    def for_language(self, language: str) -> "EspeakBackend":
+        backend = copy.copy(self)
+        backend.voice = language
+        return backend
+
+    def synthesize(self, text: str, output_path: str):
+        if self.executable is None:
+            raise FileNotFoundError("espeak-ng not found; install it with: sudo apt-get install espeak-ng")
+
+        # Text goes through stdin so long narrations are not limited by argv size
+        subprocess.run(
+            [self.executable, "-v", self.voice, "-s", str(self.speed), "-p", str(self.pitch),
+             "-w", output_path, "--stdin"],
+            input=text.encode("utf-8"), capture_output=True, check=True)
+
+
+class SilentBackend(TTSBackend):
+    """Silence as long as the narration would take to read; for previews and benchmarks"""
+
+    name = "silent"
+    extension = ".wav"
+
+    def __init__(self, words_per_minute: float = 150.0, sample_rate: int = 22050,
+                 concurrency: Optional[int] = None):
+        self.words_per_minute = words_per_minute
+        self.sample_rate = sample_rate
+        self.concurrency = max(1, concurrency or os.cpu_count() or 1)
+
+    def cache_settings(self) -> Dict:
+        return {"backend": self.name, "words_per_minute": self.words_per_minute,
+                "sample_rate": self.sample_rate}
+
+    def synthesize(self, text: str, output_path: str):
+        seconds = max(1.0, len(text.split()) / self.words_per_minute * 60)
+        with wave.open(output_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(bytes(2 * round(seconds * self.sample_rate)))
+
+
+TTS_BACKENDS: Dict[str, Type[TTSBackend]] = {
+    "gtts": GTTSBackend,
+    "espeak": EspeakBackend,
+    "silent": SilentBackend,
+}
+
+
+def register_tts_backend(name: str, backend_class: Type[TTSBackend]):
+    """Make a TTS backend selectable by name"""
+    TTS_BACKENDS[name] = backend_class
+
+
+def get_tts_backend(name: str, **options) -> TTSBackend:
+    """Create a TTS backend by name, passing options to its constructor"""
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend {name!r}; choose from {', '.join(TTS_BACKENDS)}")
+    return TTS_BACKENDS[name](**options)
@@ -1,357 +1,665 @@
 import json
+import math
 import os
-from typing import Dict, List
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
-import cv2
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip, ImageClip, concatenate_videoclips
-from gtts import gTTS
-import requests
-from io import BytesIO
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from tqdm import tqdm
+import shutil
+import subprocess
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
+from asset_cache import AssetCache, DEFAULT_CACHE_DIR, asset_key
+from audio_probe import probe_duration
+from ffmpeg_tools import (concat_stream_copy, encode_frames, encode_frames_chunked,
+                          encode_still_frame, mux_audio, mux_subtitles, streams_match)
+from job_manifest import JobManifest, atomic_output, remove_partial_files
+from stage_pipeline import Stage, run_stages
+from tracing import get_tracer, merge_traced, run_traced, span
+from tts_backends import TTSBackend, get_tts_backend
+from workspace import Workspace
+
+# Heavy backends (numpy, Pillow, matplotlib, moviepy, gTTS, tqdm) are imported
+# inside the methods that need them, so importing VideoGenerator stays cheap
+if TYPE_CHECKING:
+    import numpy as np
 
 class VideoGenerator:
-    def __init__(self, script_path: str, output_path: str = "gan_overview_video.mp4"):
+    def __init__(self, script_path: Optional[str], output_path: str = "gan_overview_video.mp4",
+                 workers: int = 1, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 cache_max_bytes: int = 2 * 1024 ** 3, concat_mode: str = "copy",
+                 still_fps: float = 1.0, script_data: Optional[Dict] = None,
+                 keep_assets: bool = False, renderer: str = "auto",
+                 tts: Union[str, TTSBackend] = "gtts", tts_workers: Optional[int] = None,
+                 audio_mode: str = "master", music_path: Optional[str] = None,
+                 target_lufs: float = -16.0, languages: Optional[List[str]] = None,
+                 variant_output: str = "tracks", subtitles: bool = True, resume: bool = False,
+                 temp_dir: Optional[str] = None, workspace_root: Optional[str] = None,
+                 disk_quota_bytes: Optional[int] = None, chunk_seconds: float = 20.0,
+                 chunk_threshold: float = 60.0, chunk_workers: Optional[int] = None):
         self.script_path = script_path
         self.output_path = output_path
-        self.temp_dir = "temp_video_assets"
+        # Private working directory: temp_dir if given, else one per output file under
+        # workspace_root, so concurrent jobs never share scene or audio files
+        if temp_dir is not None:
+            self.workspace = Workspace(temp_dir, quota_bytes=disk_quota_bytes)
+        else:
+            self.workspace = Workspace.for_output(output_path, workspace_root,
+                                                  quota_bytes=disk_quota_bytes)
+        self.temp_dir = self.workspace.path
         self.width = 1920
         self.height = 1080
         self.fps = 30
-        
-        # Create temp directory
-        os.makedirs(self.temp_dir, exist_ok=True)
-        
-        # Load script
-        with open(script_path, 'r') as f:
-            self.script_data = json.load(f)
-            self.scenes = self.script_data['scenes']
+        self.codec = 'libx264'
+        self.audio_codec = 'aac'
+        # Shared mp4 time base so clips with different frame rates concatenate cleanly
+        self.timescale = 90000
+        # Frame rate for static scenes encoded as a held frame (0 disables the fast path)
+        self.still_fps = still_fps
+        # Full-frame-rate scenes longer than chunk_threshold seconds are encoded as
+        # chunk_seconds pieces in parallel (0 disables chunking); chunks hold whole
+        # GOPs of gop_seconds, so they join by stream copy without seams
+        self.chunk_seconds = chunk_seconds
+        self.chunk_threshold = chunk_threshold
+        self.gop_seconds = 2.0
+        # Also write scene images to temp_dir as PNG (for debugging)
+        self.keep_assets = keep_assets
+        # Slide backend: "matplotlib", "pillow" or "auto" (Pillow where it can draw the diagram)
+        self.renderer = renderer
+        # Narration engine: a backend name from tts_backends or a configured instance
+        self.tts = get_tts_backend(tts) if isinstance(tts, str) else tts
+        # Narrations synthesized at once (defaults to the backend's own limit)
+        self.tts_workers = tts_workers or self.tts.concurrency
+        # Audio already synthesized in this run, by (scene_id, language)
+        self.audio_paths: Dict[tuple, str] = {}
+        # "master": video-only scene clips plus one loudness-normalized soundtrack for the
+        # whole video; "per-scene": each clip carries its own AAC narration
+        self.audio_mode = audio_mode
+        # Optional background music, ducked under the narration (master mode only)
+        self.music_path = music_path
+        self.target_lufs = target_lufs
+        # Number of processes used to render scenes (1 = render and encode in this process)
+        self.workers = max(1, workers)
+        # Chunks of one scene encoded at once; scene workers already share the cores
+        self.chunk_workers = chunk_workers or max(1, (os.cpu_count() or 1) // self.workers)
+        # Scenes allowed to wait between pipeline stages; bounds frames held in memory
+        self.queue_size = 2
+        # Per-stage timings from the last render_scenes run
+        self.stage_stats = {}
+        # "copy" joins scene clips without re-encoding, "reencode" always re-encodes
+        self.concat_mode = concat_mode
+        # Persistent artifact cache shared across runs (None disables it)
+        self.cache = AssetCache(cache_dir, cache_max_bytes) if cache_dir else None
+        
+        # Checksummed record of this job's finished scene artifacts; with resume,
+        # verified ones from an earlier (failed or killed) run are not redone
+        self.resume = resume
+        if resume:
+            remove_partial_files(self.temp_dir)
+        self.manifest = JobManifest(os.path.join(self.temp_dir, "manifest.json"), resume=resume)
+        
+        # Load script (an in-memory script from the pipeline skips the JSON round-trip)
+        if script_data is None:
+            with open(script_path, 'r') as f:
+                script_data = json.load(f)
+        self.script_data = script_data
+        self.scenes = self.script_data['scenes']
+        
+        # Variant mode: one video encode shared by a narration track per language.
+        # Scenes give translations as {"narrations": {"de": "...", ...}}; the first
+        # language may fall back to the scene's "narration".
+        self.languages = languages
+        # "tracks": one file with an audio stream per language; "files": one file per language
+        self.variant_output = variant_output
+        # Write WebVTT/SRT captions next to the output and mux them as soft subtitle tracks
+        self.subtitles = subtitles
+        self.tts_by_language = {}
+        if languages:
+            if audio_mode != "master":
+                raise ValueError("Language variants need audio_mode='master' (video-only scene clips)")
+            if variant_output not in ("tracks", "files"):
+                raise ValueError(f"Unknown variant_output {variant_output!r}; use 'tracks' or 'files'")
+            self.tts_by_language = {language: self.tts.for_language(language)
+                                    for language in languages}
+            missing = [f"scene {scene['scene_id']} ({language})"
+                       for scene in self.scenes for language in languages
+                       if self.narration_text(scene, language) is None]
+            if missing:
+                raise ValueError(f"Missing narration for: {', '.join(missing)}")
     
-    def create_ai_character(self, action: str = "explaining") -> np.ndarray:
+    def create_ai_character(self, action: str = "explaining") -> "np.ndarray":
         """Create a simple AI character avatar"""
-        # Create a blank image
-        img = Image.new('RGBA', (400, 400), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        
-        # Draw character based on action
-        if action == "greeting":
-            # Waving character
-            # Head
-            draw.ellipse([150, 50, 250, 150], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
-            # Eyes
-            draw.ellipse([170, 80, 190, 100], fill=(255, 255, 255))
-            draw.ellipse([210, 80, 230, 100], fill=(255, 255, 255))
-            draw.ellipse([175, 85, 185, 95], fill=(0, 0, 0))
-            draw.ellipse([215, 85, 225, 95], fill=(0, 0, 0))
-            # Smile
-            draw.arc([170, 100, 230, 130], start=0, end=180, fill=(50, 100, 200), width=3)
-            # Body
-            draw.rectangle([170, 150, 230, 250], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
-            # Waving arm
-            draw.line([230, 170, 280, 140], fill=(100, 150, 255), width=20)
-            draw.ellipse([270, 130, 290, 150], fill=(255, 200, 150))
-            # Other arm
-            draw.line([170, 170, 120, 200], fill=(100, 150, 255), width=20)
-            
-        elif action == "explaining":
-            # Presenting character
-            # Head
-            draw.ellipse([150, 50, 250, 150], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
-            # Eyes
-            draw.ellipse([170, 80, 190, 100], fill=(255, 255, 255))
-            draw.ellipse([210, 80, 230, 100], fill=(255, 255, 255))
-            draw.ellipse([175, 85, 185, 95], fill=(0, 0, 0))
-            draw.ellipse([215, 85, 225, 95], fill=(0, 0, 0))
-            # Talking mouth
-            draw.ellipse([180, 110, 220, 125], fill=(50, 100, 200))
-            # Body
-            draw.rectangle([170, 150, 230, 250], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
-            # Pointing arm
-            draw.line([230, 170, 280, 170], fill=(100, 150, 255), width=20)
-            draw.polygon([(280, 160), (300, 170), (280, 180)], fill=(255, 200, 150))
-            # Other arm
-            draw.line([170, 170, 120, 200], fill=(100, 150, 255), width=20)
-            
-        else:  # concluding
-            # Confident stance
-            # Head
-            draw.ellipse([150, 50, 250, 150], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
-            # Eyes
-            draw.ellipse([170, 80, 190, 100], fill=(255, 255, 255))
-            draw.ellipse([210, 80, 230, 100], fill=(255, 255, 255))
-            draw.ellipse([175, 85, 185, 95], fill=(0, 0, 0))
-            draw.ellipse([215, 85, 225, 95], fill=(0, 0, 0))
-            # Confident smile
-            draw.arc([170, 100, 230, 130], start=0, end=180, fill=(50, 100, 200), width=3)
-            # Body
-            draw.rectangle([170, 150, 230, 250], fill=(100, 150, 255), outline=(50, 100, 200), width=3)
-            # Arms crossed
-            draw.line([170, 170, 230, 200], fill=(100, 150, 255), width=20)
-            draw.line([230, 170, 170, 200], fill=(100, 150, 255), width=20)
-        
-        return np.array(img)
+        import numpy as np
+        from character_atlas import draw_pose
+        
+        with span("character", action=action):
+            return np.array(draw_pose(action))
+    
+    def _language_list(self) -> List[Optional[str]]:
+        """Narration languages (None = the single-language default)"""
+        return list(self.languages) if self.languages else [None]
+    
+    def tts_for(self, language: Optional[str]) -> TTSBackend:
+        return self.tts if language is None else self.tts_by_language[language]
+    
+    def narration_text(self, scene: Dict, language: Optional[str] = None) -> Optional[str]:
+        """A scene's narration in a language (None if it has no translation)"""
+        if language is None:
+            return scene['narration']
+        text = scene.get('narrations', {}).get(language)
+        if text is None and language == self.languages[0]:
+            text = scene.get('narration')
+        return text
+    
+    def _asset_key(self, kind: str, scene: Dict, language: Optional[str] = None) -> str:
+        """Build the cache key for one of a scene's artifacts"""
+        if kind == 'image':
+            inputs = {k: v for k, v in scene.items()
+                      if k not in ('scene_id', 'narration', 'narrations', 'subtitles',
+                                   'duration', 'character_action')}
+        elif kind == 'audio':
+            inputs = {'narration': self.narration_text(scene, language)}
+        else:
+            # Caption fixes are muxed afterwards and never re-encode a clip
+            inputs = {k: v for k, v in scene.items() if k not in ('scene_id', 'subtitles')}
+        
+        # Clip lengths follow the longest narration, so they depend on every language's voice
+        tts = (self.tts_for(language).cache_settings() if kind == 'audio' else
+               [self.tts_for(other).cache_settings() for other in self._language_list()])
+        settings = {'width': self.width, 'height': self.height,
+                    'fps': self.fps, 'codec': self.codec, 'audio_codec': self.audio_codec,
+                    'timescale': self.timescale, 'still_fps': self.still_fps,
+                    'renderer': self.renderer, 'tts': tts,
+                    'audio_mode': self.audio_mode}
+        return asset_key(kind, {'scene': inputs, 'settings': settings})
+    
+    def _completed_artifact(self, kind: str, scene: Dict, path: str,
+                            language: Optional[str] = None) -> bool:
+        """True if the job manifest vouches for path (unchanged inputs and checksum)"""
+        return self.manifest is not None and self.manifest.verify(
+            os.path.basename(path), path, self._asset_key(kind, scene, language))
+    
+    def _record_artifact(self, kind: str, scene: Dict, path: str, language: Optional[str] = None):
+        if self.manifest is not None:
+            self.manifest.record(os.path.basename(path), path, self._asset_key(kind, scene, language))
+    
+    def _cached_asset(self, kind: str, scene: Dict, path: str, build: Callable[[], None],
+                      language: Optional[str] = None) -> str:
+        """Restore an artifact from the cache, or build it and add it to the cache"""
+        if self.cache is None:
+            build()
+            return path
+        
+        key = self._asset_key(kind, scene, language)
+        suffix = os.path.splitext(path)[1]
+        if not self.cache.fetch(key, suffix, path):
+            build()
+            self.cache.store(key, suffix, path)
+        return path
     
     def generate_scene_image(self, scene: Dict) -> str:
         """Generate or create an image for a scene"""
+        from PIL import Image
+        
         image_path = os.path.join(self.temp_dir, f"scene_{scene['scene_id']}.png")
+        with span("render_image", scene_id=scene['scene_id']):
+            return self._cached_asset('image', scene, image_path,
+                                      lambda: Image.fromarray(self.render_scene_frame(scene)).save(image_path))
+    
+    def render_scene_frame(self, scene: Dict) -> "np.ndarray":
+        """Render the scene visualization to an RGB array with the selected backend"""
+        from scene_renderers import RENDER_LOCK, renderer_for
         
-        # Create a scientific visualization based on the scene content
-        fig, ax = plt.subplots(figsize=(16, 9), dpi=120)
-        fig.patch.set_facecolor('#0a0a0a')
-        ax.set_facecolor('#0a0a0a')
+        with span("render", scene_id=scene['scene_id']), RENDER_LOCK:
+            return renderer_for(scene, self.renderer).render(scene, self.width, self.height)
+    
+    def _audio_path(self, scene: Dict, language: Optional[str]) -> str:
+        suffix = f"_{language}" if language else ""
+        return os.path.join(self.temp_dir, f"audio_{scene['scene_id']}{suffix}"
+                                           f"{self.tts_for(language).extension}")
+    
+    def generate_audio(self, scene: Dict, language: Optional[str] = None) -> str:
+        """Generate audio narration for a scene"""
+        key = (scene['scene_id'], language)
+        if key in self.audio_paths:
+            return self.audio_paths[key]
+        
+        tts = self.tts_for(language)
+        audio_path = self._audio_path(scene, language)
+        
+        def synthesize():
+            with span("tts", scene_id=scene['scene_id'], backend=tts.name, language=language), \
+                    atomic_output(audio_path) as tmp_path:
+                tts.synthesize(self.narration_text(scene, language), tmp_path)
+        
+        if not self._completed_artifact('audio', scene, audio_path, language):
+            self._cached_asset('audio', scene, audio_path, synthesize, language)
+            self._record_artifact('audio', scene, audio_path, language)
+        self.audio_paths[key] = audio_path
+        return audio_path
+    
+    def create_scene_video(self, scene: Dict, audio_path: Optional[str] = None,
+                           duration: Optional[float] = None) -> str:
+        """Create a video clip for a single scene (narration is synthesized unless given)"""
+        scene_path = self._fetch_cached_clip(scene)
+        if scene_path is not None:
+            return scene_path
         
-        title_text = scene['title']
+        print(f"Creating scene {scene['scene_id']}: {scene['title']}")
+        frame = self.render_scene_still(scene)
+        audio_path = audio_path or self.generate_audio(scene, self._language_list()[0])
+        return self.encode_scene(scene, frame, audio_path, duration)
+    
+    def __getstate__(self):
+        # Sent to render processes while narration threads may still be adding
+        # entries; workers are handed the audio path they need explicitly
+        state = self.__dict__.copy()
+        state['audio_paths'] = {}
+        # Only the parent process writes the manifest
+        state['manifest'] = None
+        return state
+    
+    def _scene_path(self, scene: Dict) -> str:
+        return os.path.join(self.temp_dir, f"scene_{scene['scene_id']}.mp4")
+    
+    def _fetch_cached_clip(self, scene: Dict) -> Optional[str]:
+        """Reuse a scene's finished clip from this job or the cache, if present"""
+        scene_path = self._scene_path(scene)
+        if self._completed_artifact('clip', scene, scene_path):
+            print(f"Resuming with completed scene {scene['scene_id']}: {scene['title']}")
+            return scene_path
+        if self.cache is not None and self.cache.fetch(self._asset_key('clip', scene), '.mp4', scene_path):
+            print(f"Reusing cached scene {scene['scene_id']}: {scene['title']}")
+            return scene_path
+        return None
+    
+    def render_scene_still(self, scene: Dict) -> "np.ndarray":
+        """Render the slide with the character composited on top"""
+        from PIL import Image
+        from character_atlas import composite_sprite, get_atlas
+        
+        # Frames stay in memory; PNGs are only written with keep_assets
+        frame = self.render_scene_frame(scene)
+        with span("character.atlas", action=scene['character_action']):
+            sprite = get_atlas().sprite(scene['character_action'])
+        
+        if self.keep_assets:
+            Image.fromarray(frame).save(os.path.join(self.temp_dir, f"scene_{scene['scene_id']}.png"))
+        
+        # Composite the character once, in place
+        with span("character.composite", scene_id=scene['scene_id'], action=scene['character_action']):
+            x, y = self._character_position(frame.shape[1], frame.shape[0], sprite)
+            composite_sprite(frame, sprite, x, y)
+        
+        if self.keep_assets:
+            Image.fromarray(frame).save(os.path.join(self.temp_dir, f"still_{scene['scene_id']}.png"))
+        return frame
+    
+    def encode_scene(self, scene: Dict, frame: "np.ndarray", audio_path: str,
+                     duration: Optional[float] = None) -> str:
+        """Encode a rendered frame and its narration into the scene clip"""
+        from itertools import repeat
+        
+        scene_path = self._scene_path(scene)
+        self.workspace.check()
+        if duration is None:
+            duration = self.scene_duration(scene, [audio_path])
+        # In master mode narration is added once for the whole video instead
+        clip_audio = audio_path if self.audio_mode == "per-scene" else None
+        
+        # A killed encode leaves a .tmp- file, never a truncated scene clip
+        with span("encode", scene_id=scene['scene_id'], duration=duration), \
+                atomic_output(scene_path) as tmp_path:
+            if self.still_fps and self._is_static_scene(scene):
+                # Encode a single held frame for the whole scene
+                encode_still_frame(frame, clip_audio, duration, tmp_path,
+                                   still_fps=self.still_fps, codec=self.codec,
+                                   audio_codec=self.audio_codec, timescale=self.timescale)
+            elif self.chunk_seconds and duration > self.chunk_threshold:
+                # Long scenes would be the critical path of a single encode
+                gop = max(1, round(self.gop_seconds * self.fps))
+                encode_frames_chunked(lambda start, end: repeat(frame, end - start),
+                                      math.ceil(duration * self.fps), frame.shape[1],
+                                      frame.shape[0], self.fps, clip_audio, duration, tmp_path,
+                                      chunk_frames=round(self.chunk_seconds * self.fps), gop=gop,
+                                      workers=self.chunk_workers, codec=self.codec,
+                                      audio_codec=self.audio_codec, timescale=self.timescale)
+            else:
+                # Stream raw frames at the full frame rate into ffmpeg
+                num_frames = math.ceil(duration * self.fps)
+                encode_frames(repeat(frame, num_frames), frame.shape[1], frame.shape[0],
+                              str(self.fps), clip_audio, duration, tmp_path, codec=self.codec,
+                              audio_codec=self.audio_codec, timescale=self.timescale)
+        
+        if self.cache is not None:
+            self.cache.store(self._asset_key('clip', scene), '.mp4', scene_path)
         
-        if "introduction" in title_text.lower():
-            # Create a GaN crystal structure visualization
-            self._create_crystal_structure(ax)
-            
-        elif "application" in title_text.lower():
-            # Create applications diagram
-            self._create_applications_diagram(ax)
-            
-        elif "structure" in title_text.lower() or "architecture" in title_text.lower():
-            # Create HEMT structure diagram
-            self._create_hemt_structure(ax)
+        return scene_path
+    
+    def scene_duration(self, scene: Dict, audio_paths: List[str]) -> float:
+        """A scene lasts as long as its longest narration, but at least its scripted duration"""
+        return max([probe_duration(path) for path in audio_paths] + [scene['duration']])
+    
+    def plan_timeline(self, scenes: Optional[List[Dict]] = None) -> List[Dict]:
+        """Start time and duration of every scene, from narration headers alone.
+        
+        Synthesizes (or restores from cache) any missing narration, but decodes nothing.
+        """
+        timeline = []
+        start = 0.0
+        for scene in sorted(scenes or self.scenes, key=lambda scene: scene['scene_id']):
+            duration = self.scene_duration(scene, [self.generate_audio(scene, language)
+                                                   for language in self._language_list()])
+            timeline.append({'scene_id': scene['scene_id'], 'start': start, 'duration': duration})
+            start += duration
+        return timeline
+    
+    def estimate_disk_bytes(self) -> int:
+        """Generous estimate of the workspace's peak size, before any narration exists.
+        
+        Used to reserve disk with a HostScheduler when the job has no quota. Speech
+        length comes from word counts (130 words per minute, slower than any backend),
+        video size from the frame size at 0.002 bits per pixel (measured clips use
+        about a third of that).
+        """
+        languages = self._language_list()
+        seconds = 0.0
+        narration_bytes = 0.0
+        for scene in self.scenes:
+            speech = [len((self.narration_text(scene, language) or "").split()) * 60 / 130
+                      for language in languages]
+            seconds += max(speech + [scene['duration']])
+            for language, speech_seconds in zip(languages, speech):
+                # Uncompressed WAV narration vs. compressed (MP3) narration
+                rate = 48000 if self.tts_for(language).extension == ".wav" else 8000
+                narration_bytes += speech_seconds * rate
+        video_rate = self.width * self.height * self.fps * 0.002 / 8
+        soundtrack_rate = 24000 * len(languages)
+        # Scene clips, the joined video and the output, plus the mastered soundtracks
+        return int(narration_bytes + 3 * seconds * video_rate + seconds * soundtrack_rate)
+    
+    def _is_static_scene(self, scene: Dict) -> bool:
+        """Scenes without an animation spec are a fixed background plus a fixed character"""
+        return not scene.get('animation')
+    
+    def _character_position(self, frame_width: int, frame_height: int, sprite: "np.ndarray"):
+        """Top-left corner of the character sprite, inset from the bottom-right corner"""
+        margin = 50
+        return (frame_width - sprite.shape[1] - margin,
+                frame_height - sprite.shape[0] - margin)
+    
+    def render_scenes(self) -> List[str]:
+        """Render every scene clip and return their paths in scene_id order.
+        
+        Scenes stream through narration -> render -> encode stages joined by small
+        queues, so narration for later scenes runs while earlier ones render and
+        encode. With workers > 1, render and encode run in a process pool instead.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from tqdm import tqdm
+        from character_atlas import get_atlas
+        
+        scenes = sorted(self.scenes, key=lambda scene: scene['scene_id'])
+        
+        # Finished clips from the cache skip every later stage; repeated narration
+        # text is synthesized once by whichever scene reaches it first
+        narration_audio: Dict[str, str] = {}
+        narration_locks: Dict[str, threading.Lock] = {}
+        locks_guard = threading.Lock()
+        
+        def narrate_language(scene: Dict, language: Optional[str]) -> str:
+            text = (language, self.narration_text(scene, language))
+            with locks_guard:
+                lock = narration_locks.setdefault(text, threading.Lock())
+            with lock:
+                if text in narration_audio:
+                    audio_path = self._audio_path(scene, language)
+                    shutil.copyfile(narration_audio[text], audio_path)
+                    self.audio_paths[scene['scene_id'], language] = audio_path
+                    return audio_path
+                audio_path = narration_audio[text] = self.generate_audio(scene, language)
+                return audio_path
+        
+        def narrate(scene: Dict) -> Dict:
+            scene_path = self._fetch_cached_clip(scene)
+            # The mastered soundtrack needs every scene's narration, cached clip or not
+            if scene_path is not None and self.audio_mode != "master":
+                return {'scene': scene, 'path': scene_path}
             
-        elif "performance" in title_text.lower():
-            # Create performance comparison chart
-            self._create_performance_chart(ax)
+            audio_paths = [narrate_language(scene, language) for language in self._language_list()]
+            job = {'scene': scene, 'audio': audio_paths[0],
+                   'duration': self.scene_duration(scene, audio_paths)}
+            if scene_path is not None:
+                job['path'] = scene_path
+            return job
+        
+        def render(job: Dict) -> Dict:
+            if 'path' not in job:
+                print(f"Creating scene {job['scene']['scene_id']}: {job['scene']['title']}")
+                job['frame'] = self.render_scene_still(job['scene'])
+            return job
+        
+        def encode(job: Dict) -> str:
+            if 'path' not in job:
+                job['path'] = self.encode_scene(job['scene'], job['frame'], job['audio'],
+                                                job['duration'])
+                # Recorded as each clip completes, so a later failure keeps this scene
+                self._record_artifact('clip', job['scene'], job['path'])
+            return job['path']
+        
+        executor = None
+        if self.workers == 1 or len(scenes) < 2:
+            # Two threads importing the same package for the first time can see it
+            # half-initialized, so load the slide backends here
+            from scene_renderers import renderer_for
+            for scene in scenes:
+                renderer_for(scene, self.renderer).preload()
             
+            stages = [Stage('narration', narrate, self.tts_workers),
+                      Stage('render', render, 1),
+                      Stage('encode', encode, 1)]
         else:
-            # Default: create a tech-themed background
-            self._create_tech_background(ax)
-        
-        # Add title
-        ax.text(0.5, 0.95, title_text, transform=ax.transAxes, 
-                fontsize=32, color='white', ha='center', va='top',
-                fontweight='bold', bbox=dict(boxstyle="round,pad=0.5", 
-                facecolor='#1a1a1a', edgecolor='#4a90e2', linewidth=2))
-        
-        plt.tight_layout()
-        plt.savefig(image_path, facecolor='#0a0a0a', edgecolor='none')
-        plt.close()
-        
-        return image_path
-    
-    def _create_crystal_structure(self, ax):
-        """Create a GaN crystal structure visualization"""
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 10)
-        ax.axis('off')
-        
-        # Draw hexagonal lattice
-        positions = [(2, 5), (3, 6), (4, 5), (5, 6), (6, 5), (3, 4), (5, 4)]
-        for i, (x, y) in enumerate(positions):
-            color = '#4a90e2' if i % 2 == 0 else '#e24a90'
-            circle = plt.Circle((x, y), 0.4, color=color, alpha=0.8)
-            ax.add_patch(circle)
+            # Build the sprite atlas before forking so workers share it copy-on-write
+            get_atlas().build()
+            executor = ProcessPoolExecutor(max_workers=min(self.workers, len(scenes)))
+            # Start the workers now, before the stage threads exist (forking a
+            # process that has busy threads can deadlock the child)
+            executor.submit(int).result()
+            traced = get_tracer() is not None
             
-            # Add connections
-            for j, (x2, y2) in enumerate(positions[i+1:], i+1):
-                dist = np.sqrt((x2-x)**2 + (y2-y)**2)
-                if dist < 2:
-                    ax.plot([x, x2], [y, y2], 'w-', alpha=0.5, linewidth=2)
-        
-        # Add labels
-        ax.text(2, 5.5, 'Ga', color='white', ha='center', fontsize=14, fontweight='bold')
-        ax.text(3, 6.5, 'N', color='white', ha='center', fontsize=14, fontweight='bold')
-        
-        # Add description
-        ax.text(5, 2, 'GaN Crystal Structure\nWide Bandgap Semiconductor', 
-                ha='center', color='white', fontsize=18, alpha=0.8)
-    
-    def _create_applications_diagram(self, ax):
-        """Create applications visualization"""
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 10)
-        ax.axis('off')
-        
-        # Application boxes
-        apps = [
-            (2, 7, "5G\nCommunications", '#4a90e2'),
-            (5, 7, "Electric\nVehicles", '#e24a90'),
-            (8, 7, "Power\nElectronics", '#90e24a'),
-            (2, 4, "RF\nAmplifiers", '#e2904a'),
-            (5, 4, "Solar\nInverters", '#904ae2'),
-            (8, 4, "Radar\nSystems", '#4ae290')
-        ]
-        
-        for x, y, label, color in apps:
-            rect = patches.FancyBboxPatch((x-0.8, y-0.5), 1.6, 1, 
-                                        boxstyle="round,pad=0.1",
-                                        facecolor=color, alpha=0.7,
-                                        edgecolor='white', linewidth=2)
-            ax.add_patch(rect)
-            ax.text(x, y, label, ha='center', va='center', 
-                   color='white', fontsize=12, fontweight='bold')
-        
-        # Central GaN node
-        center = patches.Circle((5, 5.5), 1, facecolor='#1a1a1a', 
-                               edgecolor='#4a90e2', linewidth=3)
-        ax.add_patch(center)
-        ax.text(5, 5.5, 'GaN\nTechnology', ha='center', va='center',
-               color='white', fontsize=14, fontweight='bold')
-    
-    def _create_hemt_structure(self, ax):
-        """Create HEMT layer structure"""
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 10)
-        ax.axis('off')
-        
-        # Layer structure
-        layers = [
-            (2, "Substrate", '#333333'),
-            (3, "Buffer Layer", '#555555'),
-            (4, "GaN Channel", '#4a90e2'),
-            (5, "AlGaN Barrier", '#e24a90'),
-            (6, "Gate", '#ffd700'),
-            (7, "Source/Drain", '#90e24a')
-        ]
-        
-        for y, label, color in layers:
-            rect = patches.Rectangle((2, y-0.4), 6, 0.8, 
-                                   facecolor=color, alpha=0.8,
-                                   edgecolor='white', linewidth=1)
-            ax.add_patch(rect)
-            ax.text(1.5, y, label, ha='right', va='center',
-                   color='white', fontsize=12)
-        
-        # Add 2DEG indication
-        ax.plot([2, 8], [4.5, 4.5], 'y--', linewidth=2, alpha=0.8)
-        ax.text(5, 4.8, '2DEG', ha='center', color='yellow', fontsize=10)
-    
-    def _create_performance_chart(self, ax):
-        """Create performance comparison chart"""
-        materials = ['Si', 'GaAs', 'SiC', 'GaN']
-        metrics = {
-            'Breakdown Field': [0.3, 0.4, 3.0, 3.3],
-            'Electron Mobility': [1.4, 8.5, 0.9, 2.0],
-            'Thermal Conductivity': [1.5, 0.5, 4.9, 2.3]
-        }
-        
-        x = np.arange(len(materials))
-        width = 0.25
-        
-        colors = ['#4a90e2', '#e24a90', '#90e24a']
-        
-        for i, (metric, values) in enumerate(metrics.items()):
-            normalized = [v/max(values) for v in values]
-            ax.bar(x + i*width, normalized, width, label=metric, 
-                  color=colors[i], alpha=0.8)
-        
-        ax.set_xlabel('Material', fontsize=14, color='white')
-        ax.set_ylabel('Normalized Performance', fontsize=14, color='white')
-        ax.set_xticks(x + width)
-        ax.set_xticklabels(materials, color='white')
-        ax.tick_params(colors='white')
-        ax.legend(loc='upper left', facecolor='#1a1a1a', edgecolor='white')
-        ax.grid(True, alpha=0.3)
-        
-        # Highlight GaN
-        ax.axvspan(2.75, 3.75, alpha=0.2, color='yellow')
-    
-    def _create_tech_background(self, ax):
-        """Create a generic tech background"""
-        ax.set_xlim(0, 10)
-        ax.set_ylim(0, 10)
-        ax.axis('off')
-        
-        # Circuit pattern
-        np.random.seed(42)
-        for _ in range(20):
-            x = np.random.uniform(0, 10)
-            y = np.random.uniform(0, 10)
-            ax.plot([x, x + np.random.uniform(-1, 1)], 
-                   [y, y + np.random.uniform(-1, 1)], 
-                   'b-', alpha=0.3, linewidth=1)
+            def render_and_encode(job: Dict) -> str:
+                if 'path' in job:
+                    return job['path']
+                # Spans recorded in the worker process are merged into this trace
+                path = merge_traced(executor.submit(
+                    run_traced, traced, self.create_scene_video, job['scene'], job['audio'],
+                    job['duration']).result())
+                self._record_artifact('clip', job['scene'], path)
+                return path
             
-        # Add some nodes
-        for _ in range(10):
-            x = np.random.uniform(1, 9)
-            y = np.random.uniform(1, 9)
-            circle = plt.Circle((x, y), 0.1, color='#4a90e2', alpha=0.6)
-            ax.add_patch(circle)
-    
-    def generate_audio(self, scene: Dict) -> str:
-        """Generate audio narration for a scene"""
-        audio_path = os.path.join(self.temp_dir, f"audio_{scene['scene_id']}.mp3")
-        
-        # Generate speech using gTTS
-        tts = gTTS(text=scene['narration'], lang='en', slow=False)
-        tts.save(audio_path)
-        
-        return audio_path
-    
-    def create_scene_video(self, scene: Dict) -> str:
-        """Create a video clip for a single scene"""
-        print(f"Creating scene {scene['scene_id']}: {scene['title']}")
-        
-        # Generate assets
-        image_path = self.generate_scene_image(scene)
-        audio_path = self.generate_audio(scene)
-        character_img = self.create_ai_character(scene['character_action'])
-        
-        # Create character image
-        char_path = os.path.join(self.temp_dir, f"char_{scene['scene_id']}.png")
-        Image.fromarray(character_img).save(char_path)
-        
-        # Load audio to get actual duration
-        audio_clip = AudioFileClip(audio_path)
-        duration = max(audio_clip.duration, scene['duration'])
-        
-        # Create video clips
-        bg_clip = ImageClip(image_path).set_duration(duration)
-        char_clip = (ImageClip(char_path)
-                    .set_duration(duration)
-                    .resize(0.3)
-                    .set_position(('right', 'bottom'))
-                    .set_margin(50))
-        
-        # Composite video
-        video = CompositeVideoClip([bg_clip, char_clip])
-        video = video.set_audio(audio_clip)
-        
-        # Save scene video
-        scene_path = os.path.join(self.temp_dir, f"scene_{scene['scene_id']}.mp4")
-        video.write_videofile(scene_path, fps=self.fps, codec='libx264', audio_codec='aac')
-        
-        return scene_path
+            stages = [Stage('narration', narrate, self.tts_workers),
+                      Stage('render+encode', render_and_encode, self.workers)]
+        
+        progress = tqdm(total=len(scenes), desc=f"Creating scenes ({self.workers} workers)")
+        try:
+            scene_paths, self.stage_stats = run_stages(
+                scenes, stages, queue_size=self.queue_size,
+                on_result=lambda index, path: progress.update())
+        finally:
+            progress.close()
+            if executor is not None:
+                executor.shutdown()
+        
+        print("Stage utilization:")
+        for stats in self.stage_stats.values():
+            print(f"  {stats.summary()}")
+        return scene_paths
     
     def generate_video(self):
         """Generate the complete video"""
         print("Starting video generation...")
         
         # Create all scene videos
-        scene_videos = []
-        for scene in tqdm(self.scenes, desc="Creating scenes"):
-            scene_path = self.create_scene_video(scene)
-            scene_videos.append(VideoFileClip(scene_path))
-        
-        # Concatenate all scenes
+        with span("render_scenes", scenes=len(self.scenes)):
+            scene_paths = self.render_scenes()
+        return self.assemble_video(scene_paths)
+    
+    def assemble_video(self, scene_paths: List[str]) -> str:
+        """Join finished scene clips (in scene_id order) into the output with its audio and captions"""
+        # Concatenate all scenes (the joined video is about as large as its clips)
         print("Concatenating scenes...")
-        final_video = concatenate_videoclips(scene_videos)
+        self.workspace.check(sum(os.path.getsize(path) for path in scene_paths))
+        if self.languages:
+            video_path = os.path.join(self.temp_dir, "video_only.mp4")
+            self._concat(scene_paths, video_path)
+            self.mux_variants(video_path)
+        elif self.audio_mode == "master":
+            video_path = os.path.join(self.temp_dir, "video_only.mp4")
+            self._concat(scene_paths, video_path)
+            audio_path = self.master_audio()
+            print(f"Adding the soundtrack to {self.output_path}...")
+            with span("mux"):
+                mux_audio(video_path, [audio_path], self.output_path)
+        else:
+            self._concat(scene_paths, self.output_path)
         
-        # Write final video
-        print(f"Writing final video to {self.output_path}...")
-        final_video.write_videofile(self.output_path, fps=self.fps, 
-                                  codec='libx264', audio_codec='aac')
+        if self.subtitles:
+            self.add_subtitles()
         
         print(f"Video generation complete! Output: {self.output_path}")
         
+        return self.output_path
+    
+    def master_audio(self, language: Optional[str] = None) -> str:
+        """Mix every scene's narration into one normalized soundtrack for the whole video"""
+        from audio_mastering import master_narration
+        
+        timeline = self.plan_timeline()
+        scenes = {scene['scene_id']: scene for scene in self.scenes}
+        clips = [(self.generate_audio(scenes[entry['scene_id']], language), entry['duration'])
+                 for entry in timeline]
+        
+        print(f"Mastering {language or 'narration'} for {len(clips)} scenes...")
+        suffix = f"_{language}" if language else ""
+        audio_path = os.path.join(self.temp_dir, f"soundtrack{suffix}.m4a")
+        with span("master_audio", language=language):
+            return master_narration(clips, audio_path, target_lufs=self.target_lufs,
+                                    music_path=self.music_path, codec=self.audio_codec)
+    
+    def subtitle_text(self, scene: Dict, language: Optional[str] = None) -> str:
+        """Caption text: the scene's "subtitles" (a string, or a dict by language) or its narration"""
+        override = scene.get('subtitles')
+        if isinstance(override, dict):
+            override = override.get(language)
+        elif language is not None and language != self.languages[0]:
+            override = None
+        return override or self.narration_text(scene, language)
+    
+    def subtitle_cues(self, language: Optional[str] = None) -> List[tuple]:
+        """Sentence cues timed over each scene's narration in the planned timeline"""
+        from subtitles import build_cues
+        
+        scenes = {scene['scene_id']: scene for scene in self.scenes}
+        entries = []
+        for entry in self.plan_timeline():
+            scene = scenes[entry['scene_id']]
+            speech = min(probe_duration(self.generate_audio(scene, language)), entry['duration'])
+            entries.append((entry['start'], speech, self.subtitle_text(scene, language)))
+        return build_cues(entries)
+    
+    def write_subtitles(self, language: Optional[str] = None) -> List[str]:
+        """Write sidecar captions next to the output: video.vtt and video.srt (video.de.vtt, ...)"""
+        from subtitles import write_subtitles
+        
+        cues = self.subtitle_cues(language)
+        root = os.path.splitext(self.output_path)[0]
+        suffix = f".{language}" if language else ""
+        return [write_subtitles(cues, f"{root}{suffix}{ext}") for ext in (".vtt", ".srt")]
+    
+    def add_subtitles(self) -> List[str]:
+        """Regenerate captions from the script and mux them into the finished video(s).
+        
+        Audio and video are stream-copied, so this can be re-run after fixing caption
+        wording without rendering or encoding anything.
+        """
+        if self.languages and self.variant_output == "files":
+            targets = [(self.variant_path(language), [language]) for language in self.languages]
+        else:
+            targets = [(self.output_path, self._language_list())]
+        
+        sidecars = {language: self.write_subtitles(language) for language in self._language_list()}
+        for video_path, languages in targets:
+            print(f"Adding subtitles to {video_path}...")
+            muxed_path = os.path.join(self.temp_dir, "subtitled_" + os.path.basename(video_path))
+            tags = languages if self.languages else None
+            with span("subtitles", tracks=len(languages)):
+                mux_subtitles(video_path, [sidecars[language][0] for language in languages],
+                              muxed_path, tags)
+            shutil.move(muxed_path, video_path)
+        return [path for paths in sidecars.values() for path in paths]
+    
+    def variant_path(self, language: str) -> str:
+        """Output path of a language's file in "files" variant mode: video.de.mp4"""
+        root, ext = os.path.splitext(self.output_path)
+        return f"{root}.{language}{ext}"
+    
+    def mux_variants(self, video_path: str) -> List[str]:
+        """Master every language's soundtrack and mux them against the one video stream"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        # Decoding and encoding run in ffmpeg processes, so languages overlap well
+        with ThreadPoolExecutor(max_workers=len(self.languages)) as executor:
+            soundtracks = list(executor.map(self.master_audio, self.languages))
+        
+        if self.variant_output == "files":
+            outputs = [self.variant_path(language) for language in self.languages]
+            for soundtrack, language, output in zip(soundtracks, self.languages, outputs):
+                print(f"Writing the {language} variant to {output}...")
+                with span("mux", language=language):
+                    mux_audio(video_path, [soundtrack], output, [language])
+            return outputs
+        
+        print(f"Adding {len(soundtracks)} audio tracks to {self.output_path}...")
+        with span("mux", tracks=len(soundtracks)):
+            mux_audio(video_path, soundtracks, self.output_path, self.languages)
+        return [self.output_path]
+    
+    def _concat(self, scene_paths: List[str], output_path: str):
+        with span("concat", scenes=len(scene_paths), mode=self.concat_mode):
+            if not (self.concat_mode == "copy" and self._concat_stream_copy(scene_paths, output_path)):
+                self._concat_reencode(scene_paths, output_path)
+    
+    def _concat_stream_copy(self, scene_paths: List[str], output_path: str) -> bool:
+        """Join scene clips without re-encoding; returns False if that is not possible"""
+        try:
+            if not streams_match(scene_paths):
+                print("Scene clips have different stream parameters, re-encoding instead")
+                return False
+            
+            print(f"Joining scenes into {output_path} by stream copy...")
+            concat_stream_copy(scene_paths, output_path)
+            return True
+        except (OSError, RuntimeError, subprocess.CalledProcessError) as e:
+            print(f"Stream copy failed ({getattr(e, 'stderr', None) or e}), re-encoding instead")
+            return False
+    
+    def _concat_reencode(self, scene_paths: List[str], output_path: str):
+        """Decode every scene clip and encode the final video again with moviepy"""
+        from moviepy.editor import VideoFileClip, concatenate_videoclips
+        
+        scene_videos = [VideoFileClip(path) for path in scene_paths]
+        final_video = concatenate_videoclips(scene_videos)
+        
+        # Write final video
+        print(f"Writing final video to {output_path}...")
+        final_video.write_videofile(output_path, fps=self.fps, 
+                                  codec=self.codec, audio_codec=self.audio_codec,
+                                  audio=final_video.audio is not None)
+        
         # Cleanup
         for video in scene_videos:
             video.close()
-        
-        return self.output_path
     
     def cleanup(self):
-        """Remove temporary files"""
-        import shutil
+        """Remove this job's workspace (other jobs' workspaces are left alone)"""
         if os.path.exists(self.temp_dir):
-            shutil.rmtree(self.temp_dir)
+            self.workspace.remove()
             print("Cleaned up temporary files")
 
 if __name__ == "__main__":
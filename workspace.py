@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: the scheduler still works within one process tree, without the host lock
+    fcntl = None
+
+DEFAULT_WORKSPACE_ROOT = os.environ.get("GAN_VIDEO_WORKSPACE_ROOT", "temp_video_assets")
+
+DEFAULT_SCHEDULER_DIR = os.environ.get(
+    "GAN_VIDEO_SCHEDULER_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "gan_video", "scheduler"))
+
+
+class DiskQuotaExceeded(RuntimeError):
+    """A job's workspace grew past its quota, or the disk is nearly full"""
+
+
+def tmpfs_root() -> Optional[str]:
+    """A memory-backed directory for workspaces, if the host has one"""
+    for path in ("/dev/shm", "/run/shm"):
+        if os.path.isdir(path) and os.access(path, os.W_OK):
+            return os.path.join(path, "gan_video")
+    return None
+
+
+def job_id(output_path: str) -> str:
+    """Stable id per output file, so reruns (and --resume) find the same workspace"""
+    digest = hashlib.sha256(os.path.abspath(output_path).encode("utf-8")).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    return f"{stem}-{digest}"
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except FileNotFoundError:
+                pass
+    return total
+
+
+class Workspace:
+    """One job's private working directory with a disk-quota guard"""
+
+    def __init__(self, path: str, quota_bytes: Optional[int] = None,
+                 min_free_bytes: int = 512 * 1024 ** 2):
+        self.path = path
+        # Largest size the workspace may reach (None = unlimited)
+        self.quota_bytes = quota_bytes
+        # Stop before the filesystem itself fills up (tmpfs especially)
+        self.min_free_bytes = min_free_bytes
+        os.makedirs(self.path, exist_ok=True)
+
+    @classmethod
+    def for_output(cls, output_path: str, root: Optional[str] = None, **options) -> "Workspace":
+        return cls(os.path.join(root or DEFAULT_WORKSPACE_ROOT, job_id(output_path)), **options)
+
+    def usage(self) -> int:
+        return directory_size(self.path)
+
+    def check(self, extra_bytes: int = 0):
+        """Raise DiskQuotaExceeded if writing extra_bytes more would break a limit"""
+        if self.quota_bytes is not None:
+            used = self.usage()
+            if used + extra_bytes > self.quota_bytes:
+                raise DiskQuotaExceeded(
+                    f"Workspace {self.path} would use {(used + extra_bytes) / 1024 ** 2:.0f} MB, "
+                    f"over its {self.quota_bytes / 1024 ** 2:.0f} MB quota")
+        free = shutil.disk_usage(self.path).free
+        if free - extra_bytes < self.min_free_bytes:
+            raise DiskQuotaExceeded(
+                f"Only {free / 1024 ** 2:.0f} MB free on the filesystem of {self.path}")
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class HostScheduler:
+    """Admits render jobs on this host only while their CPU and disk reservations fit.
+
+    Reservations are lease files in a shared directory, guarded by a file lock, so
+    independent processes (separate CLI runs, service workers) share the budget.
+    Leases of processes that died are ignored.
+    """
+
+    def __init__(self, max_cpus: Optional[int] = None, max_disk_bytes: Optional[int] = None,
+                 state_dir: str = DEFAULT_SCHEDULER_DIR, poll_interval: float = 1.0):
+        self.max_cpus = max_cpus or os.cpu_count() or 1
+        self.max_disk_bytes = max_disk_bytes
+        self.state_dir = state_dir
+        self.poll_interval = poll_interval
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.state_dir, "lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def leases(self) -> List[Dict]:
+        """Reservations of jobs that are still running"""
+        leases = []
+        for name in os.listdir(self.state_dir):
+            if not name.startswith("lease-"):
+                continue
+            path = os.path.join(self.state_dir, name)
+            try:
+                with open(path) as f:
+                    lease = json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+            if _pid_alive(lease["pid"]):
+                leases.append(lease)
+            else:
+                os.remove(path)
+        return leases
+
+    def _fits(self, cpus: int, disk_bytes: int, leases: List[Dict]) -> bool:
+        if not leases:
+            # A job larger than the whole budget still runs, alone
+            return True
+        used_cpus = sum(lease["cpus"] for lease in leases)
+        used_disk = sum(lease["disk_bytes"] for lease in leases)
+        if used_cpus + cpus > self.max_cpus:
+            return False
+        return self.max_disk_bytes is None or used_disk + disk_bytes <= self.max_disk_bytes
+
+    @contextmanager
+    def slot(self, cpus: int = 1, disk_bytes: int = 0, name: str = "job"):
+        """Block until the job fits in the host budget, and hold its reservation"""
+        lease = {"name": name, "pid": os.getpid(), "cpus": cpus, "disk_bytes": disk_bytes,
+                 "started": time.time()}
+        lease_path = os.path.join(self.state_dir, f"lease-{os.getpid()}-{uuid.uuid4().hex}.json")
+        announced = False
+        while True:
+            with self._locked():
+                if self._fits(cpus, disk_bytes, self.leases()):
+                    with open(lease_path, "w") as f:
+                        json.dump(lease, f)
+                    break
+            if not announced:
+                print(f"Waiting for host capacity ({cpus} CPUs, {disk_bytes / 1024 ** 2:.0f} MB)...")
+                announced = True
+            time.sleep(self.poll_interval)
+        try:
+            yield lease
+        finally:
+            try:
+                os.remove(lease_path)
+            except FileNotFoundError:
+                pass